@@ -1,5 +1,26 @@
 from django.contrib import admin
-from .models import Complaint, StatusUpdate
+from .models import Complaint, Location, StatusUpdate, Notification, ReportJob
 
 admin.site.register(Complaint)
 admin.site.register(StatusUpdate)
+
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'key', 'similar_to', 'created_at')
+    list_filter = (('similar_to', admin.EmptyFieldListFilter),)
+    search_fields = ('name', 'key')
+    raw_id_fields = ('similar_to',)
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'channel', 'recipient', 'state', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('channel', 'state')
+    search_fields = ('recipient', 'subject')
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'format', 'state', 'processed_rows', 'total_rows', 'requested_by', 'created_at', 'finished_at')
+    list_filter = ('format', 'state')
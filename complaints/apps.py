@@ -0,0 +1,21 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class ComplaintsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'complaints'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(install_search, sender=self)
+
+
+def install_search(sender, using='default', **kwargs):
+    # A migration that rebuilds complaints_complaint on SQLite drops the search triggers
+    from django.db import connections
+    from django.db.migrations.recorder import MigrationRecorder
+    from . import search
+    conn = connections[using]
+    if MigrationRecorder(conn).migration_qs.filter(app='complaints', name='0010_complaint_search').exists():
+        search.install(conn)
@@ -0,0 +1,72 @@
+# complaints/bulk_actions.py
+from django.db import connection, transaction
+from django.db.models import DateTimeField, F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import metrics_cache, rollups, status_cache
+from .models import Complaint, StatusUpdate
+from .notifications import queue_emails
+
+# Statuses a manager can move selected complaints to from the dashboard
+BULK_STATUSES = ('INP', 'FIX', 'CLO')
+
+
+def transition_complaints(complaint_ids, status=None, technician=None, comment=''):
+    """
+    Assign and/or move many complaints in one transaction: one INSERT for the
+    StatusUpdate rows, one UPDATE for the complaints, a handful for the
+    rollup buckets and one INSERT for the queued emails, whatever the number
+    selected. Assigning without a status puts the complaints In Progress.
+    Complaints already Fixed or Closed are left alone. Returns (updated ids,
+    skipped ids).
+    """
+    status = status or 'INP'
+    if technician is not None and not comment:
+        comment = f'Assigned to {technician.username}'
+    requested = {int(pk) for pk in complaint_ids}
+
+    with transaction.atomic():
+        qs = Complaint.objects.filter(pk__in=requested).exclude(status__in=Complaint.RESOLVED_STATUSES)
+        if connection.features.has_select_for_update:
+            qs = qs.select_for_update()
+        targets = list(qs.order_by('pk').values_list('pk', 'email'))
+        ids = [pk for pk, _ in targets]
+        if not ids:
+            return [], sorted(requested)
+
+        when = timezone.now()
+        changes = {'status': status, 'updated_at': when}
+        if technician is not None:
+            changes['assigned_to'] = technician
+        # Same first-time-only rule as Complaint.record_status()
+        if status in Complaint.RESOLVED_STATUSES:
+            changes['resolved_at'] = Coalesce(F('resolved_at'), Value(when, output_field=DateTimeField()))
+        if status == 'CLO':
+            changes['closed_at'] = Coalesce(F('closed_at'), Value(when, output_field=DateTimeField()))
+
+        StatusUpdate.objects.bulk_create(
+            StatusUpdate(complaint_id=pk, status=status, comment=comment) for pk in ids
+        )
+        # A queryset update skips the rollup signals: move the buckets around it,
+        # writing only the net change per bucket
+        selected = Complaint.objects.filter(pk__in=ids)
+        deltas = rollups.bucket_deltas(selected, sign=-1)
+        selected.update(**changes)
+        rollups.apply_deltas(rollups.bucket_deltas(selected, deltas=deltas))
+
+        label = dict(Complaint.STATUS_CHOICES)[status]
+        if technician is not None:
+            queue_emails(
+                (email, 'Complaint Assignment', f'Your complaint #{pk} has been assigned to {technician.username}.')
+                for pk, email in targets
+            )
+        else:
+            queue_emails(
+                (email, 'Complaint Status Update', f'Your complaint #{pk} status is now {label}.')
+                for pk, email in targets
+            )
+        transaction.on_commit(metrics_cache.invalidate)
+        transaction.on_commit(lambda: status_cache.forget(ids))
+
+    return ids, sorted(requested.difference(ids))
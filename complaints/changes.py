@@ -0,0 +1,104 @@
+# complaints/changes.py
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_datetime
+
+from .models import Complaint, StatusUpdate
+from .pagination import seek
+
+# Served from complaint_changes_idx; status updates are read in primary key order
+COMPLAINT_ORDERING = ('updated_at', 'id')
+COMPLAINT_FIELDS = (
+    'id', 'name', 'contact', 'email', 'location', 'place_id', 'description', 'status',
+    'created_at', 'updated_at', 'resolved_at', 'closed_at', 'photo',
+)
+UPDATE_FIELDS = ('id', 'complaint_id', 'status', 'comment', 'timestamp')
+
+
+def token_allowed(request):
+    """True for an `Authorization: Bearer <token>` header naming one of CHANGES_FEED_TOKENS."""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    token = token.strip()
+    if scheme.lower() != 'bearer' or not token:
+        return False
+    return any(constant_time_compare(token, allowed) for allowed in getattr(settings, 'CHANGES_FEED_TOKENS', ()))
+
+
+def encode_cursor(complaint, update):
+    """`complaint` is the last (updated_at, id) sent or None, `update` the last StatusUpdate id."""
+    if complaint is not None:
+        # Full microseconds: DjangoJSONEncoder rounds to milliseconds, which would resend rows
+        complaint = [complaint[0].isoformat(), complaint[1]]
+    payload = json.dumps({'c': complaint, 'u': update})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(complaint position, update id) from a cursor; an empty cursor starts from the beginning."""
+    if not cursor:
+        return None, 0
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        complaint, update = data.get('c'), int(data.get('u') or 0)
+        if complaint is not None:
+            when, pk = parse_datetime(complaint[0]), int(complaint[1])
+            if when is None:
+                raise ValueError('bad timestamp')
+            complaint = [when, pk]
+    except (binascii.Error, ValueError, TypeError, AttributeError, IndexError, KeyError):
+        raise ValueError('Malformed cursor.')
+    return complaint, update
+
+
+def _line(record):
+    return json.dumps(record, cls=DjangoJSONEncoder) + '\n'
+
+
+def feed_lines(cursor='', limit=None):
+    """
+    Newline-delimited JSON of complaints changed and status updates added
+    since `cursor`: one line per row, oldest first, at most `limit` of each,
+    then a final {"type": "cursor"} line to pass back on the next call, with
+    "more" set when a limit was reached. Rows are read lazily from the
+    indexed querysets. Only rows older than CHANGES_FEED_SETTLE seconds are
+    sent, so a transaction committing late cannot slip in behind the cursor.
+    """
+    complaint, update = decode_cursor(cursor)
+    limit = limit or getattr(settings, 'CHANGES_FEED_LIMIT', 5000)
+    chunk_size = getattr(settings, 'REPORT_EXPORT_CHUNK_SIZE', 2000)
+    until = timezone.now() - timedelta(seconds=getattr(settings, 'CHANGES_FEED_SETTLE', 5))
+
+    def lines():
+        nonlocal complaint, update
+        more = False
+        complaints = Complaint.objects.filter(updated_at__lt=until)
+        if complaint is not None:
+            complaints = complaints.filter(seek(COMPLAINT_ORDERING, complaint, False))
+        rows = complaints.order_by(*COMPLAINT_ORDERING).values(*COMPLAINT_FIELDS)[:limit + 1]
+        for n, row in enumerate(rows.iterator(chunk_size=chunk_size)):
+            if n == limit:
+                more = True
+                break
+            row['photo'] = default_storage.url(row['photo']) if row['photo'] else None
+            complaint = [row['updated_at'], row['id']]
+            yield _line({'type': 'complaint', **row})
+
+        updates = StatusUpdate.objects.filter(pk__gt=update, timestamp__lt=until).order_by('pk')
+        for n, row in enumerate(updates.values(*UPDATE_FIELDS)[:limit + 1].iterator(chunk_size=chunk_size)):
+            if n == limit:
+                more = True
+                break
+            update = row['id']
+            yield _line({'type': 'status_update', **row})
+
+        yield _line({'type': 'cursor', 'cursor': encode_cursor(complaint, update), 'more': more})
+
+    return lines()
@@ -0,0 +1,10 @@
+# complaints/context_processors.py
+from .roles import is_technician
+
+
+def roles(request):
+    """Role flags for templates, resolved from the same cached group names as the views."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {'is_technician': False}
+    return {'is_technician': is_technician(user)}
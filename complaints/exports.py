@@ -0,0 +1,59 @@
+# complaints/exports.py
+import csv
+
+from django.http import StreamingHttpResponse
+
+from .models import Complaint
+
+REPORT_HEADERS = ['ID', 'Name', 'Contact', 'Email', 'Location', 'Status', 'Created', 'Description']
+REPORT_FIELDS = ('id', 'name', 'contact', 'email', 'location', 'status', 'created_at', 'description')
+STATUS_LABELS = dict(Complaint.STATUS_CHOICES)
+
+
+def report_queryset(filters=None):
+    """Complaints matching a ReportForm's cleaned_data, newest first."""
+    qs = Complaint.objects.order_by('-created_at')
+    filters = filters or {}
+    if filters.get('start_date'):
+        qs = qs.filter(created_at__date__gte=filters['start_date'])
+    if filters.get('end_date'):
+        qs = qs.filter(created_at__date__lte=filters['end_date'])
+    if filters.get('status'):
+        qs = qs.filter(status=filters['status'])
+    if filters.get('location'):
+        qs = qs.filter(place=filters['location'])
+    return qs
+
+
+def report_rows(qs, chunk_size=2000):
+    """
+    Yield report rows as lists of strings, fetching only the exported columns
+    in chunks so memory stays flat however many complaints match.
+    """
+    for pk, name, contact, email, location, status, created_at, description in (
+        qs.values_list(*REPORT_FIELDS).iterator(chunk_size=chunk_size)
+    ):
+        yield [
+            str(pk), name or '', contact or '', email or '',
+            location, STATUS_LABELS.get(status, status), created_at.strftime('%Y-%m-%d'), description
+        ]
+
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(qs, chunk_size=2000):
+    writer = csv.writer(Echo())
+    yield writer.writerow(REPORT_HEADERS)
+    for row in report_rows(qs, chunk_size=chunk_size):
+        yield writer.writerow(row)
+
+
+def csv_response(qs, filename='complaints_report.csv', chunk_size=2000):
+    response = StreamingHttpResponse(csv_stream(qs, chunk_size=chunk_size), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
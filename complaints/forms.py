@@ -1,7 +1,9 @@
 # complaints/forms.py
 from django import forms
 from django.utils.translation import gettext_lazy as _
-from .models import Complaint, StatusUpdate
+from .locations import resolve_location_id
+from .uploads import photo_digest
+from .models import Complaint, Location, StatusUpdate
 
 class ComplaintForm(forms.ModelForm):
     class Meta:
@@ -34,6 +36,35 @@ class ComplaintForm(forms.ModelForm):
             }),
         }
 
+    def __init__(self, *args, upload_rejections=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_rejections = upload_rejections or {}
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for field, message in self.upload_rejections.items():
+            if field in self.fields:
+                self.add_error(field, message)
+        return cleaned_data
+
+    def save(self, commit=True):
+        complaint = super().save(commit=False)
+        complaint.place_id = resolve_location_id(complaint.location)
+        photo = self.cleaned_data.get('photo')
+        if photo and 'photo' in self.changed_data:
+            complaint.photo_sha256 = photo_digest(photo)
+            # The same picture sent again (e.g. a resubmitted form) points at the stored copy
+            existing = (
+                Complaint.objects.filter(photo_sha256=complaint.photo_sha256)
+                .exclude(photo='').values_list('photo', flat=True).first()
+            )
+            if existing:
+                complaint.photo = existing
+        if commit:
+            complaint.save()
+            self._save_m2m()
+        return complaint
+
 class StatusUpdateForm(forms.ModelForm):
     class Meta:
         model = StatusUpdate
@@ -90,11 +121,12 @@ class ReportForm(forms.Form):
             'class': 'form-select'
         })
     )
-    location = forms.CharField(
+    location = forms.ModelChoiceField(
+        queryset=Location.objects.order_by('name'),
         required=False,
-        label='Location contains…',
-        widget=forms.TextInput(attrs={
-            'class': 'form-control',
-            'placeholder': 'Filter by location keyword'
+        label='Location',
+        empty_label='All locations',
+        widget=forms.Select(attrs={
+            'class': 'form-select'
         })
     )
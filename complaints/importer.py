@@ -0,0 +1,180 @@
+# complaints/importer.py
+import csv
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import metrics_cache, rollups, status_cache
+from .forms import ComplaintForm
+from .models import Complaint, StatusUpdate
+
+# Columns read on top of ComplaintForm's fields; all optional
+STATUS_COLUMN = 'status'
+TIME_COLUMNS = ('created_at', 'resolved_at', 'closed_at')
+IMPORT_COMMENT = 'Imported from {source}'
+
+
+@dataclass
+class ImportResult:
+    read: int = 0
+    imported: int = 0
+    errors: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rate(self):
+        return self.read / self.seconds if self.seconds else 0.0
+
+
+class RowError(ValueError):
+    pass
+
+
+def parse_status(value):
+    """A status code ('FIX') or label ('Fixed'), case-insensitive; blank means New."""
+    value = (value or '').strip()
+    if not value:
+        return 'NEW'
+    for code, label in Complaint.STATUS_CHOICES:
+        if value.casefold() in (code.casefold(), label.casefold()):
+            return code
+    raise RowError(f'status: unknown status "{value}".')
+
+
+def parse_timestamp(name, value):
+    """An ISO date or datetime; naive values are taken to be in the site time zone."""
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value) or parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise RowError(f'{name}: "{value}" is not a date or datetime.')
+    if not hasattr(parsed, 'hour'):
+        parsed = datetime.combine(parsed, datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def timeline_problems(status, times):
+    """
+    Resolution times that would be dropped or would count negative in the
+    rollup: resolved_at only on Fixed/Closed rows and closed_at only on Closed
+    ones, neither before created_at, and closed_at not before resolved_at.
+    """
+    created, resolved, closed = (times.get(name) for name in TIME_COLUMNS)
+    problems = []
+    if resolved and status not in Complaint.RESOLVED_STATUSES:
+        problems.append(f'resolved_at: only Fixed or Closed complaints have one (status is {status}).')
+    if closed and status != 'CLO':
+        problems.append(f'closed_at: only Closed complaints have one (status is {status}).')
+    if (resolved or closed) and not created:
+        problems.append('created_at: required when resolved_at or closed_at is given.')
+    elif created:
+        for name, value in (('resolved_at', resolved), ('closed_at', closed)):
+            if value and value < created:
+                problems.append(f'{name}: earlier than created_at.')
+    if resolved and closed and closed < resolved:
+        problems.append('closed_at: earlier than resolved_at.')
+    return problems
+
+
+def build_complaint(row, resolve=True):
+    """
+    An unsaved Complaint from one CSV row, checked with the same ComplaintForm
+    rules as the public form. Raises RowError with every problem on the row.
+    """
+    form = ComplaintForm(data={name: (value or '').strip() for name, value in row.items() if name})
+    form.fields.pop('photo')
+    problems = [f'{name}: {message}' for name, messages in form.errors.items() for message in messages]
+    times = {}
+    for name in TIME_COLUMNS:
+        try:
+            times[name] = parse_timestamp(name, row.get(name))
+        except RowError as exc:
+            problems.append(str(exc))
+    try:
+        status = parse_status(row.get(STATUS_COLUMN))
+    except RowError as exc:
+        problems.append(str(exc))
+    else:
+        if len(times) == len(TIME_COLUMNS):
+            problems += timeline_problems(status, times)
+    if problems:
+        raise RowError(' '.join(problems))
+    # form.save(commit=False) resolves the canonical place, creating new Locations
+    complaint = form.save(commit=False) if resolve else form.instance
+    complaint.status = status
+    created = times['created_at'] or timezone.now()
+    if status in Complaint.RESOLVED_STATUSES:
+        complaint.resolved_at = times['resolved_at'] or times['closed_at'] or created
+    if status == 'CLO':
+        complaint.closed_at = times['closed_at'] or complaint.resolved_at
+    complaint._imported_at = created
+    return complaint
+
+
+def insert_batch(complaints, comment=None):
+    """
+    Write one batch in a single transaction: one INSERT for the complaints,
+    one for their first StatusUpdate when `comment` is given, and the rollup
+    buckets they land in. No signals run, so no notification is queued.
+    """
+    with transaction.atomic():
+        created = Complaint.objects.bulk_create(complaints)
+        # auto_now_add stamps the insert time; put the imported times back
+        for complaint in created:
+            complaint.created_at = complaint._imported_at
+        Complaint.objects.bulk_update(created, ['created_at'])
+        if comment is not None:
+            updates = StatusUpdate.objects.bulk_create(
+                StatusUpdate(complaint=complaint, status=complaint.status, comment=comment)
+                for complaint in created
+            )
+            StatusUpdate.objects.filter(pk__in=[u.pk for u in updates]).update(timestamp=Subquery(
+                Complaint.objects.filter(pk=OuterRef('complaint_id')).values('created_at')[:1]
+            ))
+        rollups.add_complaints(Complaint.objects.filter(pk__in=[c.pk for c in created]))
+        # Ids polled before they existed may still be cached as missing
+        transaction.on_commit(lambda: status_cache.forget([c.pk for c in created]))
+    return len(created)
+
+
+def import_complaints(fh, batch_size=500, initial_updates=False, source='CSV', dry_run=False,
+                      delimiter=',', on_error=None):
+    """
+    Stream complaints from the open CSV file `fh`, a batch at a time, so memory
+    stays flat however long the file is. Invalid rows are skipped and reported
+    through `on_error(line, message)`; the rest are imported.
+    """
+    result = ImportResult()
+    comment = IMPORT_COMMENT.format(source=source) if initial_updates else None
+    started = time.perf_counter()
+    reader = csv.DictReader(fh, delimiter=delimiter)
+    batch = []
+    for row in reader:
+        result.read += 1
+        try:
+            batch.append(build_complaint(row, resolve=not dry_run))
+        except RowError as exc:
+            result.errors.append((reader.line_num, str(exc)))
+            if on_error:
+                on_error(reader.line_num, str(exc))
+            continue
+        if len(batch) >= batch_size:
+            result.imported += len(batch) if dry_run else insert_batch(batch, comment)
+            batch = []
+    if batch:
+        result.imported += len(batch) if dry_run else insert_batch(batch, comment)
+    if result.imported and not dry_run:
+        metrics_cache.invalidate()
+    result.seconds = time.perf_counter() - started
+    return result
@@ -0,0 +1,141 @@
+# complaints/locations.py
+import difflib
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .models import Location
+
+_SEPARATORS = re.compile(r'[\W_]+', re.UNICODE)
+_ROMAN = re.compile(r'[ivx]+')
+
+
+@lru_cache(maxsize=4096)
+def location_key(text):
+    """
+    Case, accent, spacing and punctuation-insensitive key, so "Kabale Town",
+    " kabale town " and "Kabale-town" all become "kabaletown".
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _SEPARATORS.sub('', text.casefold())
+
+
+def display_name(text):
+    """The citizen's spelling with runs of spaces and dashes tidied, used for new locations."""
+    return ' '.join(re.sub(r'[\s_-]+', ' ', text).split())
+
+
+def tokens(text):
+    """The words of `text` as location_key() sees them: "Kigezi Ward 2" -> ["kigezi", "ward", "2"]."""
+    return [location_key(word) for word in _SEPARATORS.split(text or '') if location_key(word)]
+
+
+def distinct_places(a, b):
+    """
+    True when two spellings name different places however similar they look:
+    their numbers differ ("Ward 1" / "Ward 2"), or their last words differ
+    and one is a letter, code or numeral ("Nyabikoni A" / "Nyabikoni B").
+    """
+    a, b = tokens(a), tokens(b)
+    if [t for t in a if t.isdigit()] != [t for t in b if t.isdigit()]:
+        return True
+    if not a or not b or a[-1] == b[-1]:
+        return False
+    return any(len(t) <= 2 or _ROMAN.fullmatch(t) for t in (a[-1], b[-1]))
+
+
+class LocationIndex:
+    """
+    Process-wide map of normalised key to Location id, loaded once from the
+    database. Exact keys are a dict lookup. A new spelling close to a known
+    one ("kabale twn") gets its own Location that records the near match as
+    similar_to for a manager to review; it is merged straight into it only
+    when LOCATION_AUTO_MERGE is on.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ids = None
+        self._names = None
+
+    def _load(self):
+        if self._ids is None:
+            rows = Location.objects.values_list('key', 'pk', 'name')
+            self._ids = {key: pk for key, pk, name in rows}
+            self._names = {key: name for key, pk, name in rows}
+        return self._ids
+
+    def clear(self):
+        with self._lock:
+            self._ids = self._names = None
+
+    def _cached(self, key):
+        """
+        The remembered id for `key` if that Location still exists. A row
+        deleted by another process (or in the admin) drops the whole map,
+        which is then reloaded, instead of filing a complaint under a dead id.
+        """
+        pk = self._load().get(key)
+        if pk is None or Location.objects.filter(pk=pk).exists():
+            return pk
+        self.clear()
+        return self._load().get(key)
+
+    def closest(self, key, text=''):
+        """The id of the known Location most like `key`, or None; never one that distinct_places() separates."""
+        cutoff = getattr(settings, 'LOCATION_MATCH_CUTOFF', 0.88)
+        if len(key) < 5 or not cutoff:
+            return None
+        for match in difflib.get_close_matches(key, list(self._load()), n=3, cutoff=cutoff):
+            if not distinct_places(text or key, self._names.get(match, match)):
+                pk = self._ids[match]
+                return pk if Location.objects.filter(pk=pk).exists() else None
+        return None
+
+    def resolve(self, text):
+        """The Location id for free-text `text`, creating the Location if it is new."""
+        key = location_key(text)
+        if not key:
+            return None
+        with self._lock:
+            pk = self._cached(key)
+            if pk is not None:
+                return pk
+            ids = self._ids
+            pk = Location.objects.filter(key=key).values_list('pk', flat=True).first()
+            if pk is None:
+                similar = self.closest(key, text)
+                if similar is not None and getattr(settings, 'LOCATION_AUTO_MERGE', False):
+                    ids[key] = similar
+                    return similar
+                name = display_name(text)
+                try:
+                    with transaction.atomic():
+                        pk = Location.objects.create(key=key, name=name, similar_to_id=similar).pk
+                except IntegrityError:
+                    # Another process created it first
+                    pk = Location.objects.get(key=key).pk
+                else:
+                    # Only remember the new row once it is committed
+                    transaction.on_commit(lambda: self._remember(key, pk, name))
+                    return pk
+            ids[key] = pk
+            return pk
+
+    def _remember(self, key, pk, name):
+        with self._lock:
+            if self._ids is not None:
+                self._ids[key] = pk
+                self._names[key] = name
+
+
+index = LocationIndex()
+
+
+def resolve_location_id(text):
+    return index.resolve(text)
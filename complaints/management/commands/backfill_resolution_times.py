@@ -0,0 +1,19 @@
+# complaints/management/commands/backfill_resolution_times.py
+from django.core.management.base import BaseCommand
+
+from complaints.metrics import backfill_resolution_times
+from complaints.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Fill Complaint.resolved_at and closed_at from existing status updates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--overwrite', action='store_true',
+                            help='Recompute every complaint instead of only those missing timestamps.')
+
+    def handle(self, *args, **options):
+        updated = backfill_resolution_times(overwrite=options['overwrite'])
+        # The backfill is a bulk UPDATE, so the rollup has to be rebuilt to see it
+        rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} complaint(s).'))
@@ -0,0 +1,123 @@
+# complaints/management/commands/benchmark_reports.py
+import random
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from complaints.exports import REPORT_HEADERS
+from complaints.renderers import RENDERERS
+
+WORDS = (
+    'burst pipe leaking water road pothole drainage blocked culvert bridge '
+    'shoulder erosion signage missing streetlight broken tarmac crack flooding'
+).split()
+LOCATIONS = ['Kabale Town', 'Katuna', 'Muhanga', 'Rubaya', 'Kamwezi', 'Hamurwa', 'Ikumba']
+STATUSES = ['New', 'In Progress', 'Fixed', 'Closed']
+
+
+def synthetic_rows(count, seed=0):
+    """Report rows shaped like exports.report_rows() output, without touching the database."""
+    rnd = random.Random(seed)
+    for pk in range(count, 0, -1):
+        words = rnd.randint(5, 120)
+        yield [
+            str(pk),
+            f'Citizen {pk}',
+            f'+2567{pk:08d}'[:13],
+            f'citizen{pk}@example.com' if pk % 3 else '',
+            rnd.choice(LOCATIONS),
+            rnd.choice(STATUSES),
+            f'2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}',
+            ' '.join(rnd.choice(WORDS) for _ in range(words)),
+        ]
+
+
+def legacy_pdf(rows, out, progress=None):
+    """The original single-Table export, kept as the baseline to measure against."""
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    doc = SimpleDocTemplate(out, pagesize=landscape(letter))
+    styles = getSampleStyleSheet()
+    elements = [Paragraph('Complaints Report', styles['Title'])]
+    data = [list(REPORT_HEADERS)] + list(rows)
+    table = Table(data, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ]))
+    elements.append(table)
+    doc.build(elements)
+
+
+def legacy_word(rows, out, progress=None):
+    """The original cell-by-cell python-docx export."""
+    from docx import Document
+    from docx.enum.section import WD_ORIENT
+
+    docx = Document()
+    section = docx.sections[0]
+    section.orientation = WD_ORIENT.LANDSCAPE
+    section.page_width, section.page_height = section.page_height, section.page_width
+    docx.add_heading('Complaints Report', 0)
+    table = docx.add_table(rows=1, cols=len(REPORT_HEADERS))
+    hdr = table.rows[0].cells
+    for i, h in enumerate(REPORT_HEADERS):
+        hdr[i].text = h
+    for values in rows:
+        cells = table.add_row().cells
+        for i, value in enumerate(values):
+            cells[i].text = value
+    docx.save(out)
+
+
+BASELINES = {
+    'pdf': legacy_pdf,
+    'word': legacy_word,
+}
+
+
+class Command(BaseCommand):
+    help = 'Time report renderers on synthetic rows and report wall time and peak Python memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help='Row counts to render (default 1000 10000 100000).')
+        parser.add_argument('--format', choices=sorted(RENDERERS), nargs='+', default=['pdf'],
+                            help='Export formats to benchmark.')
+        parser.add_argument('--baseline', action='store_true',
+                            help='Also run the previous implementation for comparison.')
+        parser.add_argument('--baseline-max-rows', type=int, default=10000,
+                            help='Skip the baseline above this many rows; it does not scale.')
+
+    def measure(self, fn, count):
+        with tempfile.TemporaryFile() as out:
+            tracemalloc.start()
+            started = time.perf_counter()
+            fn(synthetic_rows(count), out)
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            size = out.tell()
+        return elapsed, peak, size
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'format':<8}{'impl':<10}{'rows':>8}{'seconds':>10}{'peak MiB':>10}{'file KiB':>10}")
+        for fmt in options['format']:
+            impls = [('current', RENDERERS[fmt])]
+            if options['baseline'] and fmt in BASELINES:
+                impls.append(('baseline', BASELINES[fmt]))
+            for count in options['rows']:
+                for name, fn in impls:
+                    if name == 'baseline' and count > options['baseline_max_rows']:
+                        continue
+                    elapsed, peak, size = self.measure(fn, count)
+                    self.stdout.write(
+                        f'{fmt:<8}{name:<10}{count:>8}{elapsed:>10.2f}{peak / 2 ** 20:>10.1f}{size / 1024:>10.0f}'
+                    )
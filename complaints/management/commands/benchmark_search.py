@@ -0,0 +1,62 @@
+# complaints/management/commands/benchmark_search.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from complaints.models import Complaint
+from complaints.pagination import SEARCH_ORDERING
+from complaints.search import icontains_search, ranked_search
+
+from .benchmark_reports import synthetic_rows
+
+QUERIES = ['pothole', 'burst pipe', 'drain', 'Katuna', 'streetlight broken', 'nothing matches this']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare the full-text search index against the old icontains filter on synthetic complaints.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000,
+                            help='Synthetic complaints to insert (rolled back afterwards).')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query; the best is reported.')
+        parser.add_argument('--page', type=int, default=50, help='Rows fetched per search, as on the dashboard.')
+
+    def seed(self, count):
+        Complaint.objects.bulk_create(
+            (Complaint(name=name, contact=contact, location=location, description=description)
+             for _, name, contact, _, location, _, _, description in synthetic_rows(count)),
+            batch_size=2000,
+        )
+
+    def best(self, qs, repeat):
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = list(qs.all())
+            times.append(time.perf_counter() - started)
+        return min(times) * 1000, len(rows)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'query':<24}{'icontains ms':>14}{'hits':>7}{'search ms':>12}{'hits':>7}")
+        try:
+            with transaction.atomic():
+                if options['rows']:
+                    self.stdout.write(f"Seeding {options['rows']} complaints on {connection.vendor}...")
+                    self.seed(options['rows'])
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE')
+                page, repeat = options['page'], options['repeat']
+                for query in QUERIES:
+                    old = Complaint.objects.filter(icontains_search(query)).order_by('-created_at')[:page]
+                    new = ranked_search(Complaint.objects.all(), query).order_by(*SEARCH_ORDERING)[:page]
+                    old_ms, old_hits = self.best(old, repeat)
+                    new_ms, new_hits = self.best(new, repeat)
+                    self.stdout.write(f'{query:<24}{old_ms:>14.1f}{old_hits:>7}{new_ms:>12.1f}{new_hits:>7}')
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,336 @@
+# complaints/management/commands/benchmark_views.py
+import html
+import itertools
+import json
+import platform
+import re
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from complaints import metrics_cache, status_cache
+from complaints.models import Complaint, ReportJob, StatusUpdate
+from complaints.report_jobs import run_job
+from complaints.urls import urlpatterns
+
+from .seed_complaints import seed
+
+
+# Accepted by the changes feed for the duration of the run
+FEED_TOKEN = 'benchmark'
+# The "Next" link rendered by complaints/pagination.html
+NEXT_LINK = re.compile(r'<a class="page-link" href="([^"#]+)">Next')
+
+
+class Rollback(Exception):
+    pass
+
+
+@dataclass
+class Case:
+    name: str
+    url_name: str
+    path: object = ''
+    client: str = 'anonymous'
+    method: str = 'get'
+    # Or a callable, called before the clock starts on every run
+    data: object = field(default_factory=dict)
+    headers: dict = field(default_factory=dict)
+    # Measured instead of a request, for work done outside the request cycle
+    call: object = None
+
+
+def consume(response):
+    """Read the whole body, so streamed exports are generated inside the measurement."""
+    if getattr(response, 'streaming', False):
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive every complaints URL through the test client and record wall time, query count and '
+        'peak Python memory as a JSON baseline. Runs in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed this many synthetic complaints first (rolled back afterwards).')
+        parser.add_argument('--repeat', type=int, default=3, help='Warm runs per case; the best is reported.')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--compare', help='A previous --output file to print the differences against.')
+        parser.add_argument('--only', nargs='+', default=[], help='Run only cases whose name contains one of these.')
+        parser.add_argument('--skip', nargs='+', default=[], help='Skip cases whose name contains one of these.')
+        parser.add_argument('--label', default='', help='Free text stored with the results, e.g. a commit id.')
+
+    def render(self, fmt):
+        """Render a fresh report job the way process_report_jobs does."""
+        job = ReportJob.objects.create(format=fmt, cache_key='benchmark', state=ReportJob.RUNNING,
+                                       requested_by=self.manager)
+        run_job(job)
+        job.refresh_from_db()
+        self.files.append(job.file)
+        self.jobs[fmt] = job.pk
+        return job.file.size if job.file else 0
+
+    def job_path(self, view, fmt='pdf', query=''):
+        def path():
+            pk = self.jobs.get(fmt)
+            return reverse(f'complaints:{view}', args=[pk]) + query if pk else None
+        return path
+
+    def cases(self):
+        open_complaint = Complaint.objects.exclude(status__in=Complaint.RESOLVED_STATUSES).order_by('-pk').first()
+        any_complaint = Complaint.objects.order_by('-pk').first()
+        new_ids = [str(pk) for pk in Complaint.objects.filter(status='NEW').order_by('-created_at', 'id')
+                   .values_list('pk', flat=True)[:50]]
+        admin = reverse('complaints:admin_dashboard')
+        reports = reverse('complaints:reports')
+        cases = [
+            Case('create:get', 'create', reverse('complaints:create')),
+            Case('create:post', 'create', reverse('complaints:create'), method='post', data={
+                'name': 'Benchmark', 'contact': '+256700000000', 'email': 'bench@example.com',
+                'location': 'Kabale Town', 'description': 'Burst pipe flooding the road',
+            }),
+            Case('lookup:get', 'status_lookup', reverse('complaints:status_lookup')),
+            Case('login:get', 'login', reverse('complaints:login')),
+            Case('logout:post', 'logout', reverse('complaints:logout'), client='fresh-manager', method='post'),
+            Case('metrics', 'dashboard', reverse('complaints:dashboard'), client='manager'),
+            Case('metrics:cache', 'metrics_cache_stats', reverse('complaints:metrics_cache_stats'), client='manager'),
+            Case('admin_dashboard', 'admin_dashboard', admin, client='manager'),
+            Case('admin_dashboard:search', 'admin_dashboard', admin + '?q=burst+pipe', client='manager'),
+            Case('admin_dashboard:page2', 'admin_dashboard', self.next_page(admin, 'manager'), client='manager'),
+            Case('admin_dashboard:search:page2', 'admin_dashboard', self.next_page(admin + '?q=pipe', 'manager'),
+                 client='manager'),
+            Case('changes_feed', 'changes_feed', reverse('complaints:changes_feed'),
+                 headers={'Authorization': f'Bearer {FEED_TOKEN}'}),
+            Case('reports', 'reports', reports, client='manager'),
+            Case('reports:csv', 'reports', reports + '?export=csv', client='manager'),
+        ]
+        for fmt in ('pdf', 'word'):
+            cases += [
+                Case(f'reports:{fmt}', 'reports', reports + f'?export={fmt}', client='manager'),
+                Case(f'report_job:{fmt}:render', 'reports', call=lambda fmt=fmt: self.render(fmt)),
+            ]
+        cases += [
+            Case('report_job', 'report_job', self.job_path('report_job'), client='manager'),
+            Case('report_job:json', 'report_job', self.job_path('report_job', query='?format=json'), client='manager'),
+            Case('report_job_download', 'report_job_download', self.job_path('report_job_download'), client='manager'),
+        ]
+        if any_complaint is not None:
+            # Cached by the status_json case; dropped again after the rollback
+            self.status_pks.append(any_complaint.pk)
+            cases += [
+                Case('submitted', 'complaint_submitted',
+                     reverse('complaints:complaint_submitted', args=[any_complaint.pk])),
+                Case('lookup:post', 'status_lookup', reverse('complaints:status_lookup'), method='post',
+                     data={'complaint_id': any_complaint.pk, 'contact': any_complaint.contact}),
+                Case('status_json', 'status_json', reverse('complaints:status_json', args=[any_complaint.pk]),
+                     data={'contact': any_complaint.contact}),
+            ]
+        if open_complaint is not None:
+            cases.append(Case('update:get', 'complaint_update',
+                              reverse('complaints:complaint_update', args=[open_complaint.pk]), client='manager'))
+        if self.technician is not None:
+            technician = reverse('complaints:technician_dashboard')
+            cases += [
+                Case('technician_dashboard', 'technician_dashboard', technician, client='technician'),
+                Case('technician_dashboard:inp', 'technician_dashboard', technician + '?status=INP',
+                     client='technician'),
+                Case('technician_dashboard:inp:page2', 'technician_dashboard',
+                     self.next_page(technician + '?status=INP', 'technician'), client='technician'),
+            ]
+            if new_ids:
+                cases.append(Case('admin_dashboard:bulk_assign', 'admin_dashboard', admin, client='manager',
+                                  method='post', data=self.bulk_assign_data(new_ids)))
+        return cases
+
+    def bulk_assign_data(self, ids):
+        """
+        Form data that hands `ids` to a different technician on every run, so
+        warm runs reassign them instead of repeating the cold run's no-op.
+        """
+        others = list(User.objects.filter(groups__name='Technician').exclude(pk=self.technician.pk)[:1])
+        if not others:
+            other = User.objects.create(username='benchmark-technician')
+            other.groups.add(Group.objects.get(name='Technician'))
+            others = [other]
+        targets = itertools.cycle([self.technician, others[0]])
+        return lambda: {'complaint': ids, 'technician': str(next(targets).pk)}
+
+    def next_page(self, path, client):
+        """
+        The second page, by following the "Next" link the first page renders.
+        Warns when that link drops one of the first page's filters or carries
+        no cursor, since the second page would then repeat the first.
+        """
+        def page():
+            response = self.client_for(client).get(path)
+            match = NEXT_LINK.search(response.content.decode())
+            if match is None:
+                return None
+            link = urljoin(path, html.unescape(match.group(1)))
+            before, after = parse_qs(urlsplit(path).query), parse_qs(urlsplit(link).query)
+            lost = [key for key, value in before.items() if after.get(key) != value]
+            if lost or 'after' not in after:
+                self.stderr.write(f"Next link on {path} is broken: {link} (lost {', '.join(lost) or 'the cursor'})")
+            return link
+        return page
+
+    def client_for(self, kind):
+        if kind == 'fresh-manager':
+            client = Client()
+            client.force_login(self.manager)
+            return client
+        if kind not in self.clients:
+            client = Client()
+            if kind == 'manager':
+                client.force_login(self.manager)
+            elif kind == 'technician':
+                client.force_login(self.technician)
+            self.clients[kind] = client
+        return self.clients[kind]
+
+    def run_once(self, case, path):
+        """(seconds, queries, status, bytes) for one run; clients log in before the clock starts."""
+        client = None if case.call is not None else self.client_for(case.client)
+        data = case.data() if callable(case.data) else case.data
+        # The query log is a bounded deque; once full its length stops counting
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            if client is None:
+                status, size = 200, case.call()
+            else:
+                response = getattr(client, case.method)(path, data, headers=case.headers)
+                status, size = response.status_code, consume(response)
+            elapsed = time.perf_counter() - started
+        return elapsed, len(queries), status, size
+
+    def measure(self, case, repeat):
+        path = case.path() if callable(case.path) else case.path
+        if path is None:
+            return None
+        # Cold: the dashboard caches are empty, as after any complaint changes
+        metrics_cache.invalidate()
+        cold, cold_queries, status, size = self.run_once(case, path)
+        warm = min(self.run_once(case, path)[0] for _ in range(repeat)) if repeat else cold
+        tracemalloc.start()
+        warm_queries = self.run_once(case, path)[1]
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return {
+            'url_name': case.url_name,
+            'path': path if case.call is None else '',
+            'status': status,
+            'bytes': size,
+            'cold_ms': round(cold * 1000, 2),
+            'warm_ms': round(warm * 1000, 2),
+            'cold_queries': cold_queries,
+            'warm_queries': warm_queries,
+            'peak_kib': round(peak / 1024, 1),
+        }
+
+    def selected(self, cases, only, skip):
+        return [
+            case for case in cases
+            if (not only or any(s in case.name for s in only)) and not any(s in case.name for s in skip)
+        ]
+
+    def compare(self, results, path):
+        with open(path) as fh:
+            previous = json.load(fh)['results']
+        self.stdout.write(f"\n{'case':<34}{'warm ms':>20}{'queries':>14}")
+        for name, now in results.items():
+            before = previous.get(name)
+            if before is None:
+                self.stdout.write(f'{name:<34}{"new case":>20}')
+                continue
+            slower = now['warm_ms'] > before['warm_ms'] * 1.2 and now['warm_ms'] - before['warm_ms'] > 1
+            more = now['warm_queries'] > before['warm_queries']
+            flag = self.style.WARNING(' <-') if slower or more else ''
+            self.stdout.write(
+                f"{name:<34}{before['warm_ms']:>9.1f} ->{now['warm_ms']:>7.1f}"
+                f"{before['warm_queries']:>7} ->{now['warm_queries']:>4}{flag}"
+            )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 0:
+            raise CommandError('--repeat cannot be negative.')
+        self.clients, self.jobs, self.files, self.status_pks = {}, {}, [], []
+        output = {}
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                                   CHANGES_FEED_TOKENS=[FEED_TOKEN], CHANGES_FEED_SETTLE=0), transaction.atomic():
+                if options['seed']:
+                    self.stdout.write(f"Seeding {options['seed']} complaints on {connection.vendor}...")
+                    seed(options['seed'])
+                self.manager, _ = User.objects.get_or_create(
+                    username='benchmark-manager', defaults={'is_superuser': True, 'is_staff': True}
+                )
+                # The technician with the most assignments has the heaviest dashboard
+                self.technician = (
+                    User.objects.filter(groups__name='Technician')
+                    .annotate(n=Count('assigned_complaints')).order_by('-n').first()
+                )
+                cases = self.cases()
+                missing = {p.name for p in urlpatterns} - {case.url_name for case in cases}
+                if missing:
+                    self.stderr.write(f"No benchmark case for: {', '.join(sorted(missing))}")
+
+                results = {}
+                self.stdout.write(
+                    f"{'case':<34}{'status':>7}{'cold ms':>10}{'warm ms':>10}{'queries':>9}{'peak KiB':>10}"
+                )
+                for case in self.selected(cases, options['only'], options['skip']):
+                    result = self.measure(case, options['repeat'])
+                    if result is None:
+                        self.stdout.write(f'{case.name:<34}{"skipped":>7}')
+                        continue
+                    results[case.name] = result
+                    self.stdout.write(
+                        f"{case.name:<34}{result['status']:>7}{result['cold_ms']:>10.1f}{result['warm_ms']:>10.1f}"
+                        f"{result['cold_queries']:>4}/{result['warm_queries']:<4}{result['peak_kib']:>10.0f}"
+                    )
+                output = {
+                    'label': options['label'],
+                    'recorded_at': timezone.now().isoformat(),
+                    'database': connection.vendor,
+                    'python': platform.python_version(),
+                    'django': django.get_version(),
+                    'complaints': Complaint.objects.count(),
+                    'status_updates': StatusUpdate.objects.count(),
+                    'repeat': options['repeat'],
+                    'results': results,
+                }
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            for report in self.files:
+                if report:
+                    report.delete(save=False)
+            # Entries cached from the rolled-back rows; the on_commit hooks that
+            # would have dropped them never ran
+            metrics_cache.invalidate()
+            status_cache.forget(self.status_pks)
+
+        if options['compare']:
+            self.compare(output['results'], options['compare'])
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(output, fh, indent=2, sort_keys=True)
+                fh.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote {len(output['results'])} result(s) to {options['output']}."))
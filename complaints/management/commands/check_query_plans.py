@@ -0,0 +1,38 @@
+# complaints/management/commands/check_query_plans.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from complaints.query_plans import check_plans, seed_plan_rows
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN the hot complaint queries and fail if any of them misses its index. '
+        'complaints.tests runs the same checks on a seeded test database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Insert this many synthetic complaints first (rolled back afterwards).')
+
+    def handle(self, *args, **options):
+        failures = 0
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    seed_plan_rows(options['seed'])
+                for label, index, plan, problems in check_plans():
+                    failures += bool(problems)
+                    status = 'FAIL ' + '; '.join(problems) if problems else 'ok'
+                    self.stdout.write(f'{label:<26}{status}')
+                    if problems or options['verbosity'] > 1:
+                        self.stdout.write('    ' + plan.replace('\n', '\n    '))
+                raise Rollback
+        except Rollback:
+            pass
+        if failures:
+            raise CommandError(f'{failures} quer{"y" if failures == 1 else "ies"} missed their index.')
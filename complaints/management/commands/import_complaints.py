@@ -0,0 +1,55 @@
+# complaints/management/commands/import_complaints.py
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from complaints.importer import import_complaints
+
+
+class Command(BaseCommand):
+    help = (
+        'Import complaints from a CSV file with columns name, contact, email, location, description '
+        'and optionally status, created_at, resolved_at and closed_at. Rows are checked with the '
+        'public complaint form rules; no confirmation emails or SMS are sent.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to import (save spreadsheets as CSV UTF-8).')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Complaints inserted per transaction.')
+        parser.add_argument('--initial-updates', action='store_true',
+                            help='Also add an "Imported from ..." status update to each complaint.')
+        parser.add_argument('--delimiter', default=',',
+                            help='Field separator, e.g. ";" for some spreadsheet exports.')
+        parser.add_argument('--encoding', default='utf-8-sig',
+                            help='File encoding.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only validate the rows; nothing is written.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        def report(line, message):
+            self.stderr.write(f'Line {line}: {message}')
+
+        try:
+            with open(options['path'], newline='', encoding=options['encoding']) as fh:
+                result = import_complaints(
+                    fh,
+                    batch_size=options['batch_size'],
+                    initial_updates=options['initial_updates'],
+                    source=os.path.basename(options['path']),
+                    dry_run=options['dry_run'],
+                    delimiter=options['delimiter'],
+                    on_error=report,
+                )
+        except (OSError, UnicodeDecodeError) as exc:
+            raise CommandError(f'Could not read {options["path"]}: {exc}')
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        style = self.style.WARNING if result.errors else self.style.SUCCESS
+        self.stdout.write(style(
+            f'{verb} {result.imported} of {result.read} row(s), {len(result.errors)} rejected, '
+            f'in {result.seconds:.2f}s ({result.rate:.0f} rows/s).'
+        ))
@@ -0,0 +1,37 @@
+# complaints/management/commands/process_photos.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from complaints.photos import process_photos, reset_photos
+
+
+class Command(BaseCommand):
+    help = 'Write the EXIF-free, downscaled thumbnail and large renditions of complaint photos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Re-process every photo, not only those without renditions (backfill).')
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Stop after processing this many photos.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling for new uploads instead of exiting when none are left.')
+        parser.add_argument('--sleep', type=float, default=5.0,
+                            help='Seconds to wait between polls when idle in --loop mode.')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            self.stdout.write(f'Queued {reset_photos()} photo(s) for processing.')
+        totals = {'done': 0, 'failed': 0}
+        while True:
+            counts = process_photos(limit=options['limit'])
+            for key, value in counts.items():
+                totals[key] += value
+            if not options['loop']:
+                break
+            if not any(counts.values()):
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            'Processed {done} photo(s), {failed} failed.'.format(**totals)
+        ))
@@ -0,0 +1,33 @@
+# complaints/management/commands/process_report_jobs.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from complaints.report_jobs import process_report_jobs
+
+
+class Command(BaseCommand):
+    help = 'Render queued PDF and Word report exports into MEDIA_ROOT.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Stop after rendering this many jobs.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling for new jobs instead of exiting when the queue is empty.')
+        parser.add_argument('--sleep', type=float, default=2.0,
+                            help='Seconds to wait between polls when idle in --loop mode.')
+
+    def handle(self, *args, **options):
+        totals = {'done': 0, 'failed': 0}
+        while True:
+            counts = process_report_jobs(limit=options['limit'])
+            for key, value in counts.items():
+                totals[key] += value
+            if not options['loop']:
+                break
+            if not any(counts.values()):
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            'Rendered {done} report(s), {failed} failed.'.format(**totals)
+        ))
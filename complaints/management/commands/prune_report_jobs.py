@@ -0,0 +1,12 @@
+# complaints/management/commands/prune_report_jobs.py
+from django.core.management.base import BaseCommand
+
+from complaints.report_jobs import prune_report_jobs
+
+
+class Command(BaseCommand):
+    help = 'Delete superseded and expired PDF/Word report jobs and their files from MEDIA_ROOT.'
+
+    def handle(self, *args, **options):
+        deleted = prune_report_jobs()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} report job(s).'))
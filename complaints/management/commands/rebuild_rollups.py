@@ -0,0 +1,16 @@
+# complaints/management/commands/rebuild_rollups.py
+from django.core.management.base import BaseCommand
+
+from complaints.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the DailyMetric rollup table from all complaints.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows per bulk insert.')
+
+    def handle(self, *args, **options):
+        created = rebuild_rollups(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {created} rollup row(s).'))
@@ -0,0 +1,17 @@
+# complaints/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from complaints import search
+
+
+class Command(BaseCommand):
+    help = 'Recreate the complaint full-text search index (SQLite FTS5 or PostgreSQL GIN) from the complaints table.'
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.stdout.write(f'No full-text index on {connection.vendor}; search uses icontains.')
+            return
+        with transaction.atomic():
+            search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the {connection.vendor} search index.'))
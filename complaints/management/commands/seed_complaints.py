@@ -0,0 +1,158 @@
+# complaints/management/commands/seed_complaints.py
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from complaints import metrics_cache
+from complaints.locations import resolve_location_id
+from complaints.models import Complaint, StatusUpdate
+from complaints.roles import TECHNICIAN
+from complaints.rollups import rebuild_rollups
+
+from .benchmark_reports import LOCATIONS, WORDS
+
+# Roughly the mix on the live system: most complaints are being worked on or done
+STATUS_WEIGHTS = {'NEW': 20, 'INP': 30, 'FIX': 15, 'CLO': 35}
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk_create keep the created_at/timestamp values we set instead of auto_now_add's now()."""
+    saved = [(f, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, value in saved:
+            f.auto_now_add = value
+
+
+def spelling(rnd, location):
+    """Mostly the canonical name, sometimes as citizens type it, so location matching is exercised."""
+    roll = rnd.random()
+    if roll < 0.1:
+        return location.lower()
+    if roll < 0.15:
+        return f' {location.upper()} '
+    return location
+
+
+def technicians(count):
+    group, _ = Group.objects.get_or_create(name=TECHNICIAN)
+    users = []
+    for i in range(1, count + 1):
+        user, created = User.objects.get_or_create(username=f'tech{i:02d}')
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+        user.groups.add(group)
+        users.append(user)
+    return users
+
+
+def synthetic_complaint(rnd, pk, now, days, crews, places):
+    """One unsaved complaint plus the (status, when) history that led to its current status."""
+    status = rnd.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0]
+    created = now - timedelta(seconds=rnd.uniform(0, days * 86400))
+    location = rnd.choice(LOCATIONS)
+    complaint = Complaint(
+        name=f'Citizen {pk}',
+        contact=f'+2567{pk:08d}'[:13],
+        email=f'citizen{pk}@example.com' if pk % 3 else None,
+        location=spelling(rnd, location),
+        place_id=places[location],
+        description=' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(5, 60))),
+        created_at=created,
+        status=status,
+    )
+    history = []
+    if status != 'NEW':
+        complaint.assigned_to = rnd.choice(crews)
+        assigned = min(created + timedelta(hours=rnd.uniform(0.5, 48)), now)
+        history.append(('INP', assigned))
+    if status in Complaint.RESOLVED_STATUSES:
+        complaint.resolved_at = min(assigned + timedelta(hours=rnd.expovariate(1 / 72)), now)
+        history.append(('FIX', complaint.resolved_at))
+    if status == 'CLO':
+        complaint.closed_at = min(complaint.resolved_at + timedelta(hours=rnd.uniform(0, 72)), now)
+        history.append(('CLO', complaint.closed_at))
+    return complaint, history
+
+
+def seed(count, technician_count=8, days=365, seed_value=0, batch_size=5000, with_updates=True, progress=None):
+    """Insert `count` synthetic complaints in batches; returns (complaints, status updates) created."""
+    rnd = random.Random(seed_value)
+    crews = technicians(technician_count)
+    places = {name: resolve_location_id(name) for name in LOCATIONS}
+    now = timezone.now()
+    start = (Complaint.objects.order_by('-pk').values_list('pk', flat=True).first() or 0) + 1
+    created = updates = 0
+    fields = (Complaint._meta.get_field('created_at'), StatusUpdate._meta.get_field('timestamp'))
+    with explicit_timestamps(*fields):
+        for offset in range(0, count, batch_size):
+            rows = [
+                synthetic_complaint(rnd, start + offset + i, now, days, crews, places)
+                for i in range(min(batch_size, count - offset))
+            ]
+            with transaction.atomic():
+                saved = Complaint.objects.bulk_create([complaint for complaint, _ in rows])
+                if with_updates:
+                    updates += len(StatusUpdate.objects.bulk_create(
+                        StatusUpdate(complaint=complaint, status=status, timestamp=when,
+                                     comment=f'Assigned to {complaint.assigned_to.username}' if status == 'INP' else '')
+                        for complaint, (_, history) in zip(saved, rows)
+                        for status, when in history
+                    ))
+            created += len(saved)
+            if progress:
+                progress(created)
+    # bulk_create skips the rollup signals; rebuilding once is cheaper than per row
+    rebuild_rollups()
+    metrics_cache.invalidate()
+    return created, updates
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with realistic synthetic complaints, status histories and technicians '
+        'for load testing (10k to 1M rows). Rollups are rebuilt afterwards; nothing is sent.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--complaints', type=int, default=10000, help='Complaints to create.')
+        parser.add_argument('--technicians', type=int, default=8,
+                            help='Technician accounts (tech01, tech02, ...) to spread assignments over.')
+        parser.add_argument('--days', type=int, default=365, help='Spread created_at over this many past days.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for repeatable data sets.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Complaints inserted per transaction.')
+        parser.add_argument('--no-updates', action='store_true', help='Skip the StatusUpdate history rows.')
+        parser.add_argument('--force', action='store_true', help='Allow seeding when DEBUG is off.')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('Refusing to seed synthetic data with DEBUG off; pass --force if this is intended.')
+        if options['technicians'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--technicians and --batch-size must be at least 1.')
+        started = time.perf_counter()
+        created, updates = seed(
+            options['complaints'],
+            technician_count=options['technicians'],
+            days=options['days'],
+            seed_value=options['seed'],
+            batch_size=options['batch_size'],
+            with_updates=not options['no_updates'],
+            progress=lambda n: self.stdout.write(f'  {n} complaints...'),
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {created} complaint(s) and {updates} status update(s) '
+            f'across {options["technicians"]} technician(s) in {elapsed:.1f}s.'
+        ))
@@ -0,0 +1,34 @@
+# complaints/management/commands/send_notifications.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from complaints.notifications import process_outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued email and SMS notifications from the outbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Notifications claimed per batch (default NOTIFICATION_BATCH_SIZE).')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling the outbox instead of exiting when it is empty.')
+        parser.add_argument('--sleep', type=float, default=5.0,
+                            help='Seconds to wait between polls when idle in --loop mode.')
+
+    def handle(self, *args, **options):
+        totals = {'sent': 0, 'skipped': 0, 'retried': 0, 'dead': 0}
+        while True:
+            counts = process_outbox(batch_size=options['batch_size'])
+            for key, value in counts.items():
+                totals[key] += value
+            if any(counts.values()):
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            'Sent {sent}, skipped {skipped}, retried {retried}, dead {dead}.'.format(**totals)
+        ))
@@ -0,0 +1,182 @@
+# complaints/metrics.py
+from django.db import connection
+from django.db.models import Aggregate, Avg, Count, DurationField, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, Now, TruncMonth
+
+from . import metrics_cache
+from .models import Complaint, DailyMetric, StatusUpdate
+
+CLOSED_STATUSES = ['FIX', 'CLO']
+
+
+class Median(Aggregate):
+    """PERCENTILE_CONT(0.5) for backends that have ordered-set aggregates (PostgreSQL)."""
+    function = 'PERCENTILE_CONT'
+    name = 'Median'
+    template = '%(function)s(0.5) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+
+def supports_percentile():
+    return connection.vendor == 'postgresql'
+
+
+def _days(delta):
+    return round(delta.total_seconds() / 86400, 2) if delta else 0
+
+
+def resolution_queryset(qs, field='resolved_at'):
+    """One resolution delta per complaint: `field` (resolved_at or closed_at) minus created_at."""
+    return (
+        qs.filter(**{f'{field}__isnull': False})
+        .annotate(resolution=ExpressionWrapper(F(field) - F('created_at'), output_field=DurationField()))
+    )
+
+
+def median_resolution(qs, field='resolved_at', count=None):
+    """
+    Median resolution in days, computed in the database: PERCENTILE_CONT on
+    PostgreSQL, elsewhere a single ORDER BY ... LIMIT/OFFSET lookup. Pass
+    `count` when the number of resolved complaints is already known.
+    """
+    deltas = resolution_queryset(qs, field)
+    if supports_percentile():
+        return _days(deltas.aggregate(median=Median('resolution', output_field=DurationField()))['median'])
+
+    n = deltas.count() if count is None else count
+    if not n:
+        return 0
+    ordered = deltas.order_by('resolution').values_list('resolution', flat=True)
+    if n % 2:
+        return _days(ordered[n // 2])
+    lower, upper = ordered[n // 2 - 1:n // 2 + 1]
+    return _days((lower + upper) / 2)
+
+
+def resolution_stats(qs, field='resolved_at'):
+    """Mean and median resolution in days."""
+    agg = resolution_queryset(qs, field).aggregate(n=Count('resolution'), avg=Avg('resolution'))
+    return _days(agg['avg']), median_resolution(qs, field, count=agg['n'])
+
+
+def status_breakdown(qs):
+    """Total and per-status counts in a single conditional-aggregation query."""
+    return qs.aggregate(
+        total=Count('id'),
+        new=Count('id', filter=Q(status='NEW')),
+        in_progress=Count('id', filter=Q(status='INP')),
+        fixed=Count('id', filter=Q(status='FIX')),
+        closed=Count('id', filter=Q(status='CLO')),
+        closed_by_tech=Count('id', filter=Q(status__in=CLOSED_STATUSES, assigned_to__isnull=False)),
+    )
+
+
+def manager_metrics():
+    """
+    Context for the manager metrics dashboard, read from the DailyMetric
+    rollup so the cost follows the number of days on record rather than the
+    number of complaints. Closed includes FIX and CLO that were assigned to a
+    technician. Only the median still reads Complaint, via resolved_at.
+    """
+    rollup = DailyMetric.objects.all()
+    resolved = Q(status__in=CLOSED_STATUSES)
+    counts = rollup.aggregate(
+        total=Coalesce(Sum('count'), 0),
+        new=Coalesce(Sum('count', filter=Q(status='NEW')), 0),
+        in_progress=Coalesce(Sum('count', filter=Q(status='INP')), 0),
+        fixed=Coalesce(Sum('count', filter=Q(status='FIX')), 0),
+        closed_by_tech=Coalesce(Sum('count', filter=resolved & Q(technician__isnull=False)), 0),
+        resolved=Coalesce(Sum('resolved_count', filter=resolved), 0),
+        seconds=Coalesce(Sum('resolution_seconds', filter=resolved), 0.0),
+    )
+    avg_days = round(counts['seconds'] / counts['resolved'] / 86400, 2) if counts['resolved'] else 0
+    median_days = median_resolution(Complaint.objects.filter(status__in=CLOSED_STATUSES))
+
+    monthly = list(
+        rollup.annotate(month=TruncMonth('day'))
+        .values('month')
+        .annotate(count=Sum('count'))
+        .filter(count__gt=0)
+        .order_by('month')
+    )
+    top = list(
+        rollup.filter(place__isnull=False)
+        .values('place', location=F('place__name'))
+        .annotate(count=Sum('count'))
+        .filter(count__gt=0)
+        .order_by('-count')[:5]
+    )
+    return {
+        'total': counts['total'],
+        'breakdown': {
+            'new': counts['new'],
+            'in_progress': counts['in_progress'],
+            'fixed': counts['fixed'],
+            'closed': counts['closed_by_tech'],
+        },
+        'avg_resolution': avg_days,
+        'median_resolution': median_days,
+        'monthly': monthly,
+        'top_locations': top,
+    }
+
+
+def technician_metrics(user):
+    """
+    Counts and resolution times over the complaints assigned to `user`: the
+    counters and the mean in one conditional-aggregation query, plus the
+    median lookup.
+    """
+    qs = Complaint.objects.filter(assigned_to=user)
+    closed = Q(status='CLO', closed_at__isnull=False)
+    resolution = ExpressionWrapper(F('closed_at') - F('created_at'), output_field=DurationField())
+    counts = qs.aggregate(
+        total=Count('id'),
+        new=Count('id', filter=Q(status='NEW')),
+        in_progress=Count('id', filter=Q(status='INP')),
+        fixed=Count('id', filter=Q(status='FIX')),
+        closed=Count('id', filter=Q(status='CLO')),
+        resolved=Count('id', filter=closed),
+        avg=Avg(resolution, filter=closed),
+    )
+    return {
+        'total': counts['total'],
+        'status_counts': {
+            'new': counts['new'],
+            'in_progress': counts['in_progress'],
+            'fixed': counts['fixed'],
+            'closed': counts['closed'],
+        },
+        'avg_resolution': _days(counts['avg']),
+        'median_resolution': median_resolution(qs.filter(status='CLO'), field='closed_at', count=counts['resolved']),
+    }
+
+
+def cached_manager_metrics():
+    return metrics_cache.cached_context('manager', manager_metrics)
+
+
+def cached_technician_metrics(user):
+    return metrics_cache.cached_context(f'technician:{user.pk}', lambda: technician_metrics(user))
+
+
+def backfill_resolution_times(overwrite=False):
+    """
+    Set resolved_at/closed_at from the earliest matching StatusUpdate in one
+    UPDATE. Without overwrite, only complaints still missing them are touched.
+    """
+    def first(statuses):
+        return Subquery(
+            StatusUpdate.objects
+            .filter(complaint=OuterRef('pk'), status__in=statuses)
+            .order_by('timestamp')
+            .values('timestamp')[:1]
+        )
+
+    qs = Complaint.objects.all()
+    if not overwrite:
+        qs = qs.filter(Q(resolved_at__isnull=True) | Q(closed_at__isnull=True))
+    return qs.update(
+        updated_at=Now(),
+        resolved_at=first(Complaint.RESOLVED_STATUSES) if overwrite else Coalesce('resolved_at', first(Complaint.RESOLVED_STATUSES)),
+        closed_at=first(['CLO']) if overwrite else Coalesce('closed_at', first(['CLO'])),
+    )
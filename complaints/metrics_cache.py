@@ -0,0 +1,78 @@
+# complaints/metrics_cache.py
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+GENERATION_KEY = 'metrics:generation'
+HITS_KEY = 'metrics:hits'
+MISSES_KEY = 'metrics:misses'
+
+
+def get_cache():
+    return caches[getattr(settings, 'METRICS_CACHE', 'default')]
+
+
+def _generation(cache):
+    """
+    Every cached context is keyed under the current generation, so one write
+    retires all of them at once. A fresh value is used if the key was evicted
+    so that entries written under an older generation are never read again.
+    """
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        if not cache.add(GENERATION_KEY, generation, None):
+            generation = cache.get(GENERATION_KEY, generation)
+    return generation
+
+
+def _count(cache, key):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); losing one tick is fine
+        pass
+
+
+def cached_context(name, compute, ttl=None):
+    """
+    Return the cached result of compute() for `name` (e.g. 'manager' or
+    'technician:<pk>'), computing and storing it on a miss.
+    """
+    cache = get_cache()
+    ttl = getattr(settings, 'METRICS_CACHE_TTL', 0) if ttl is None else ttl
+    if not ttl:
+        return compute()
+    key = f'metrics:{_generation(cache)}:{name}'
+    context = cache.get(key)
+    if context is not None:
+        _count(cache, HITS_KEY)
+        return context
+    _count(cache, MISSES_KEY)
+    context = compute()
+    cache.set(key, context, ttl)
+    return context
+
+
+def invalidate():
+    """Drop every cached dashboard context; called whenever complaints or status updates change."""
+    get_cache().set(GENERATION_KEY, time.time_ns(), None)
+
+
+def stats():
+    cache = get_cache()
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counters.get(HITS_KEY, 0), counters.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 3) if lookups else None,
+        'ttl': getattr(settings, 'METRICS_CACHE_TTL', 0),
+    }
+
+
+def reset_stats():
+    get_cache().delete_many([HITS_KEY, MISSES_KEY])
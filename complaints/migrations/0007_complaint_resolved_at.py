@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:07
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill(apps, schema_editor):
+    Complaint = apps.get_model('complaints', 'Complaint')
+    StatusUpdate = apps.get_model('complaints', 'StatusUpdate')
+
+    def first(statuses):
+        return Subquery(
+            StatusUpdate.objects
+            .filter(complaint=OuterRef('pk'), status__in=statuses)
+            .order_by('timestamp')
+            .values('timestamp')[:1]
+        )
+
+    Complaint.objects.update(resolved_at=first(['FIX', 'CLO']), closed_at=first(['CLO']))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaints', '0006_reportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='resolved_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def build_rollups(apps, schema_editor):
+    Complaint = apps.get_model('complaints', 'Complaint')
+    DailyMetric = apps.get_model('complaints', 'DailyMetric')
+    resolution = ExpressionWrapper(F('resolved_at') - F('created_at'), output_field=DurationField())
+    grouped = (
+        Complaint.objects
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'status', 'location', 'assigned_to')
+        .annotate(
+            n=Count('id'),
+            resolved=Count('id', filter=Q(resolved_at__isnull=False)),
+            seconds=Sum(resolution, filter=Q(resolved_at__isnull=False)),
+        )
+        .order_by()
+    )
+    DailyMetric.objects.bulk_create([
+        DailyMetric(
+            day=row['day'],
+            status=row['status'],
+            location=row['location'],
+            technician_id=row['assigned_to'],
+            count=row['n'],
+            resolved_count=row['resolved'],
+            resolution_seconds=row['seconds'].total_seconds() if row['seconds'] else 0,
+        )
+        for row in grouped
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaints', '0007_complaint_resolved_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('NEW', 'New'), ('INP', 'In Progress'), ('FIX', 'Fixed'), ('CLO', 'Closed')], max_length=3)),
+                ('location', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+                ('resolved_count', models.IntegerField(default=0)),
+                ('resolution_seconds', models.FloatField(default=0)),
+                ('technician', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'status', 'location', 'technician'), name='dailymetric_bucket_uniq')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:20
+
+import complaints.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+FTS_TABLE = 'complaints_complaint_fts'
+PG_VECTOR = (
+    "to_tsvector('simple'::regconfig, COALESCE(complaints_complaint.location, '') "
+    "|| ' ' || COALESCE(complaints_complaint.description, ''))"
+)
+
+SQLITE_FORWARD = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        location, description,
+        content='complaints_complaint', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON complaints_complaint BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, location, description) VALUES (new.id, new.location, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON complaints_complaint BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, location, description)
+        VALUES ('delete', old.id, old.location, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF location, description ON complaints_complaint BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, location, description)
+        VALUES ('delete', old.id, old.location, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, location, description) VALUES (new.id, new.location, new.description);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+PG_FORWARD = [f'CREATE INDEX IF NOT EXISTS complaint_search_idx ON complaints_complaint USING GIN (({PG_VECTOR}))']
+PG_BACKWARD = ['DROP INDEX IF EXISTS complaint_search_idx']
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor in statements:
+            with schema_editor.connection.cursor() as cursor:
+                for sql in statements[vendor]:
+                    cursor.execute(sql)
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaints', '0009_complaint_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_FORWARD, 'postgresql': PG_FORWARD}),
+            run({'sqlite': SQLITE_BACKWARD, 'postgresql': PG_BACKWARD}),
+        ),
+        migrations.CreateModel(
+            name='ComplaintSearchEntry',
+            fields=[
+                ('complaint', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='complaints.complaint')),
+                ('location', models.TextField()),
+                ('description', models.TextField()),
+                ('document', complaints.search.FullTextDocument(db_column='complaints_complaint_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'complaints_complaint_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:26
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def location_key(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return re.sub(r'[\W_]+', '', text.casefold())
+
+
+def link_locations(apps, schema_editor):
+    """One Location per normalised key, named after its most common spelling."""
+    Complaint = apps.get_model('complaints', 'Complaint')
+    Location = apps.get_model('complaints', 'Location')
+    spellings = defaultdict(Counter)
+    raw = defaultdict(list)
+    for text, n in Complaint.objects.values_list('location').annotate(n=Count('id')).order_by():
+        key = location_key(text)
+        if key:
+            spellings[key][' '.join(re.sub(r'[\s_-]+', ' ', text).split())] += n
+            raw[key].append(text)
+    for key, names in spellings.items():
+        place = Location.objects.create(key=key, name=names.most_common(1)[0][0])
+        Complaint.objects.filter(location__in=raw[key]).update(place=place)
+
+
+def clear_rollups(apps, schema_editor):
+    apps.get_model('complaints', 'DailyMetric').objects.all().delete()
+
+
+def build_rollups(apps, schema_editor):
+    Complaint = apps.get_model('complaints', 'Complaint')
+    DailyMetric = apps.get_model('complaints', 'DailyMetric')
+    resolution = ExpressionWrapper(F('resolved_at') - F('created_at'), output_field=DurationField())
+    grouped = (
+        Complaint.objects
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'status', 'place', 'assigned_to')
+        .annotate(
+            n=Count('id'),
+            resolved=Count('id', filter=Q(resolved_at__isnull=False)),
+            seconds=Sum(resolution, filter=Q(resolved_at__isnull=False)),
+        )
+        .order_by()
+    )
+    DailyMetric.objects.bulk_create(
+        (
+            DailyMetric(
+                day=row['day'],
+                status=row['status'],
+                place_id=row['place'],
+                technician_id=row['assigned_to'],
+                count=row['n'],
+                resolved_count=row['resolved'],
+                resolution_seconds=row['seconds'].total_seconds() if row['seconds'] else 0,
+            )
+            for row in grouped.iterator(chunk_size=2000)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaints', '0010_complaint_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('key', models.CharField(help_text='Normalised name used for matching', max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(clear_rollups, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='dailymetric',
+            name='dailymetric_bucket_uniq',
+        ),
+        migrations.RemoveField(
+            model_name='dailymetric',
+            name='location',
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='place',
+            field=models.ForeignKey(blank=True, help_text='Canonical location matched from the free-text location', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='complaints', to='complaints.location'),
+        ),
+        migrations.RunPython(link_locations, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='dailymetric',
+            name='place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='complaints.location'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailymetric',
+            constraint=models.UniqueConstraint(fields=('day', 'status', 'place', 'technician'), name='dailymetric_bucket_uniq'),
+        ),
+        migrations.RunPython(build_rollups, clear_rollups),
+    ]
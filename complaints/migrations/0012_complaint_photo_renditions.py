@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaints', '0011_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='photo_error',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='photo_large',
+            field=models.ImageField(blank=True, null=True, upload_to='complaint_photos/large/'),
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='photo_processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='photo_thumbnail',
+            field=models.ImageField(blank=True, null=True, upload_to='complaint_photos/thumbnails/'),
+        ),
+    ]
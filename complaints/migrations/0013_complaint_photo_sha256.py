@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaints', '0012_complaint_photo_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='photo_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
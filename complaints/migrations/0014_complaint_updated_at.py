@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:44
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Existing rows were last changed by their latest status update, or when created."""
+    Complaint = apps.get_model('complaints', 'Complaint')
+    StatusUpdate = apps.get_model('complaints', 'StatusUpdate')
+    latest = (
+        StatusUpdate.objects.filter(complaint=OuterRef('pk'))
+        .order_by('-timestamp')
+        .values('timestamp')[:1]
+    )
+    Complaint.objects.update(updated_at=Coalesce(Subquery(latest), 'created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaints', '0013_complaint_photo_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['updated_at', 'id'], name='complaint_changes_idx'),
+        ),
+    ]
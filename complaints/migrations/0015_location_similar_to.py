@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaints', '0014_complaint_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='similar_to',
+            field=models.ForeignKey(blank=True, help_text='An existing location this spelling closely matched; review and merge if they are the same place', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='complaints.location'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:00
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def requeue_abandoned(apps, schema_editor):
+    """Photos claimed by a worker that died before rendering: processed, yet no renditions and no error."""
+    Complaint = apps.get_model('complaints', 'Complaint')
+    (
+        Complaint.objects.exclude(photo='').exclude(photo__isnull=True)
+        .filter(photo_processed_at__isnull=False, photo_error='')
+        .filter(Q(photo_thumbnail='') | Q(photo_thumbnail__isnull=True))
+        .update(photo_processed_at=None)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaints', '0015_location_similar_to'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='photo_claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(requeue_abandoned, migrations.RunPython.noop),
+    ]
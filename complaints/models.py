@@ -1,7 +1,29 @@
 # complaints/models.py
 
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .search import FTS_TABLE, FullTextDocument
+
+
+class Location(models.Model):
+    """
+    Canonical place a complaint is about. Free-text Complaint.location is
+    mapped here by complaints.locations so spelling variants group together.
+    """
+    name = models.CharField(max_length=255)
+    key = models.CharField(max_length=255, unique=True, help_text='Normalised name used for matching')
+    similar_to = models.ForeignKey(
+        'self', null=True, blank=True, on_delete=models.SET_NULL, related_name='+',
+        help_text='An existing location this spelling closely matched; review and merge if they are the same place',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
 
 
 class Complaint(models.Model):
@@ -16,10 +38,34 @@ class Complaint(models.Model):
     contact = models.CharField(max_length=64, blank=True)
     email = models.EmailField(blank=True, null=True)
     location = models.CharField(max_length=255)
+    place = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='complaints',
+        help_text='Canonical location matched from the free-text location'
+    )
     description = models.TextField()
     photo = models.ImageField(upload_to='complaint_photos/', blank=True, null=True)
+    # Downscaled, EXIF-free copies of photo written by `manage.py process_photos`
+    photo_thumbnail = models.ImageField(upload_to='complaint_photos/thumbnails/', blank=True, null=True)
+    photo_large = models.ImageField(upload_to='complaint_photos/large/', blank=True, null=True)
+    photo_processed_at = models.DateTimeField(null=True, blank=True)
+    # Lease taken by the worker rendering the photo; an expired one is picked up again
+    photo_claimed_until = models.DateTimeField(null=True, blank=True)
+    photo_error = models.CharField(max_length=500, blank=True)
+    # SHA-256 of the uploaded bytes, hashed while the upload streams in
+    photo_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Last write to the row, read by the changes feed. Queryset update() calls
+    # that touch fields the feed exports must set it themselves.
+    updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=3, choices=STATUS_CHOICES, default='NEW')
+    # First time the complaint reached Fixed/Closed, and first time it was Closed.
+    # Kept in step by StatusUpdate.save() so resolution stats never join updates.
+    resolved_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    closed_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     assigned_to = models.ForeignKey(
         User,
@@ -30,9 +76,93 @@ class Complaint(models.Model):
         help_text='The technician this complaint is assigned to'
     )
 
+    RESOLVED_STATUSES = ('FIX', 'CLO')
+    # Fields that decide which DailyMetric bucket a complaint counts towards
+    ROLLUP_FIELDS = ('created_at', 'status', 'place_id', 'assigned_to_id', 'resolved_at')
+
+    class Meta:
+        # One index per listing order in views.py, so pages are read in index
+        # order instead of sorted; status_lookup's (pk, contact) is served by the PK.
+        indexes = [
+            models.Index(fields=['status', '-created_at', 'id'], name='complaint_status_recent_idx'),
+            models.Index(fields=['-created_at', 'id'], name='complaint_recent_idx'),
+            models.Index(fields=['assigned_to', 'status', '-created_at', 'id'], name='complaint_tech_status_idx'),
+            models.Index(fields=['assigned_to', '-created_at', 'id'], name='complaint_tech_recent_idx'),
+            # Changes feed cursor order
+            models.Index(fields=['updated_at', 'id'], name='complaint_changes_idx'),
+        ]
+
     def __str__(self):
         return f"Complaint #{self.id} - {self.get_status_display()}"
 
+    @property
+    def photo_view_url(self):
+        """The large rendition when it exists, otherwise the original upload."""
+        photo = self.photo_large or self.photo
+        return photo.url if photo else ''
+
+    @property
+    def photo_preview_url(self):
+        photo = self.photo_thumbnail or self.photo
+        return photo.url if photo else ''
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if not instance.get_deferred_fields().intersection(cls.ROLLUP_FIELDS):
+            instance._rollup_values = tuple(getattr(instance, f) for f in cls.ROLLUP_FIELDS)
+        if 'location' not in instance.get_deferred_fields():
+            # Compared on save to tell whether place needs matching again
+            instance._loaded_location = instance.location
+        return instance
+
+    def record_status(self, status, when):
+        """
+        Stamp resolved_at/closed_at the first time the complaint reaches those
+        statuses. Writes only the columns that were still empty, so a stale
+        in-memory instance cannot move an existing timestamp.
+        """
+        changes = {}
+        if status in self.RESOLVED_STATUSES and self.resolved_at is None:
+            changes['resolved_at'] = when
+        if status == 'CLO' and self.closed_at is None:
+            changes['closed_at'] = when
+        if not changes:
+            return
+        from . import rollups
+        old_state = rollups.stored_state(self)
+        Complaint.objects.filter(pk=self.pk).update(updated_at=timezone.now(), **{
+            field: Coalesce(F(field), Value(value, output_field=models.DateTimeField()))
+            for field, value in changes.items()
+        })
+        for field, value in changes.items():
+            setattr(self, field, value)
+        if 'resolved_at' in changes:
+            rollups.resolution_stamped(self, old_state)
+
+
+class ComplaintSearchEntry(models.Model):
+    """
+    The SQLite FTS5 index over Complaint.location/description, exposed so
+    searches can join it; rows are written by database triggers, never here.
+    See complaints.search.
+    """
+    complaint = models.OneToOneField(
+        Complaint,
+        primary_key=True,
+        db_column='rowid',
+        on_delete=models.DO_NOTHING,
+        related_name='search_entry',
+    )
+    location = models.TextField()
+    description = models.TextField()
+    document = FullTextDocument(db_column=FTS_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
+
 
 class StatusUpdate(models.Model):
     complaint = models.ForeignKey(
@@ -44,5 +174,149 @@ class StatusUpdate(models.Model):
     comment = models.TextField(blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['complaint', 'timestamp'], name='statusupdate_timeline_idx'),
+        ]
+
     def __str__(self):
         return f"Update {self.get_status_display()} for #{self.complaint.id}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.complaint.record_status(self.status, self.timestamp)
+
+
+class Notification(models.Model):
+    """
+    Outbox row for an email or SMS. Views only insert these; the
+    send_notifications command delivers them outside the request.
+    """
+    EMAIL = 'EMAIL'
+    SMS = 'SMS'
+    CHANNEL_CHOICES = [
+        (EMAIL, 'Email'),
+        (SMS, 'SMS'),
+    ]
+
+    PENDING = 'PEN'
+    SENT = 'SNT'
+    SKIPPED = 'SKP'
+    DEAD = 'DED'
+    STATE_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (SKIPPED, 'Skipped'),
+        (DEAD, 'Dead'),
+    ]
+
+    channel = models.CharField(max_length=5, choices=CHANNEL_CHOICES)
+    recipient = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField()
+    state = models.CharField(max_length=3, choices=STATE_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['state', 'next_attempt_at'], name='notification_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_channel_display()} to {self.recipient} ({self.get_state_display()})"
+
+
+class ReportJob(models.Model):
+    """
+    A PDF or Word export rendered by the process_report_jobs command.
+    Jobs with the same cache_key (format, filters and data version) are reused.
+    """
+    FORMAT_CHOICES = [
+        ('pdf', 'PDF'),
+        ('word', 'Word'),
+    ]
+
+    PENDING = 'PEN'
+    RUNNING = 'RUN'
+    DONE = 'DON'
+    FAILED = 'ERR'
+    STATE_CHOICES = [
+        (PENDING, 'Queued'),
+        (RUNNING, 'Rendering'),
+        (DONE, 'Ready'),
+        (FAILED, 'Failed'),
+    ]
+
+    format = models.CharField(max_length=4, choices=FORMAT_CHOICES)
+    filters = models.JSONField(default=dict, blank=True)
+    cache_key = models.CharField(max_length=64, db_index=True)
+    state = models.CharField(max_length=3, choices=STATE_CHOICES, default=PENDING)
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to='reports/', blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='report_jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['state', 'created_at'], name='reportjob_queue_idx'),
+        ]
+
+    @property
+    def progress(self):
+        if self.state == self.DONE:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(99, int(self.processed_rows * 100 / self.total_rows))
+
+    def __str__(self):
+        return f"Report #{self.id} ({self.format}) - {self.get_state_display()}"
+
+
+class DailyMetric(models.Model):
+    """
+    Rollup of complaints per created day, current status, place and
+    technician, kept in step with Complaint writes by complaints.rollups so
+    the metrics dashboard reads a few rows per day instead of every complaint.
+    """
+    day = models.DateField()
+    status = models.CharField(max_length=3, choices=Complaint.STATUS_CHOICES)
+    place = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    technician = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    count = models.IntegerField(default=0)
+    resolved_count = models.IntegerField(default=0)
+    resolution_seconds = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status', 'place', 'technician'], name='dailymetric_bucket_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status} {self.place_id}: {self.count}"
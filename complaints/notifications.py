@@ -0,0 +1,147 @@
+# complaints/notifications.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection, send_mail
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import sms
+from .models import Notification
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def queue_email(recipient, subject, body):
+    if not recipient:
+        return None
+    return Notification.objects.create(
+        channel=Notification.EMAIL,
+        recipient=recipient,
+        subject=subject,
+        body=body,
+    )
+
+
+def queue_emails(messages):
+    """Queue many (recipient, subject, body) emails with one INSERT."""
+    return Notification.objects.bulk_create(
+        Notification(channel=Notification.EMAIL, recipient=recipient, subject=subject, body=body)
+        for recipient, subject, body in messages
+        if recipient
+    )
+
+
+def queue_sms(recipient, body):
+    if not recipient:
+        return None
+    return Notification.objects.create(
+        channel=Notification.SMS,
+        recipient=recipient,
+        body=body,
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2*base, 4*base ... capped at NOTIFICATION_MAX_DELAY."""
+    base = _setting('NOTIFICATION_RETRY_DELAY', 60)
+    cap = _setting('NOTIFICATION_MAX_DELAY', 60 * 60)
+    return timedelta(seconds=min(cap, base * 2 ** max(attempts - 1, 0)))
+
+
+def send_email(notification, mail_connection=None):
+    send_mail(
+        notification.subject,
+        notification.body,
+        settings.DEFAULT_FROM_EMAIL,
+        [notification.recipient],
+        fail_silently=False,
+        connection=mail_connection,
+    )
+
+
+def claim_batch(batch_size, now=None):
+    """
+    Pick due notifications and push their next_attempt_at forward by a lease so
+    a second worker running at the same time does not send them again.
+    """
+    now = now or timezone.now()
+    lease = timedelta(seconds=_setting('NOTIFICATION_LEASE', 300))
+    lock = {'skip_locked': True} if connection.features.has_select_for_update_skip_locked else {}
+    with transaction.atomic():
+        batch = list(
+            Notification.objects
+            .select_for_update(**lock)
+            .filter(state=Notification.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if batch:
+            Notification.objects.filter(pk__in=[n.pk for n in batch]).update(next_attempt_at=now + lease)
+    return batch
+
+
+def process_outbox(batch_size=None, sms_backend=None, now=None):
+    """
+    Deliver one batch from the outbox. Emails share one SMTP connection and
+    SMS go out through the pooled gateway's send_many(). Failures are retried
+    with backoff and dead-lettered after NOTIFICATION_MAX_ATTEMPTS. Returns a
+    dict of counts.
+    """
+    batch_size = batch_size or _setting('NOTIFICATION_BATCH_SIZE', 50)
+    counts = {'sent': 0, 'skipped': 0, 'retried': 0, 'dead': 0}
+
+    batch = claim_batch(batch_size, now=now)
+    if not batch:
+        return counts
+
+    emails = [n for n in batch if n.channel == Notification.EMAIL]
+    texts = [n for n in batch if n.channel == Notification.SMS]
+
+    if emails:
+        mail_connection = get_connection(fail_silently=False)
+        try:
+            mail_connection.open()
+        except Exception as exc:
+            for n in emails:
+                _record(n, counts, error=_describe(exc))
+        else:
+            try:
+                for n in emails:
+                    try:
+                        send_email(n, mail_connection=mail_connection)
+                    except Exception as exc:
+                        _record(n, counts, error=_describe(exc))
+                    else:
+                        _record(n, counts)
+            finally:
+                mail_connection.close()
+
+    if texts:
+        backend = sms_backend or sms.get_backend()
+        results = backend.send_many((n.recipient, n.body) for n in texts)
+        for n, result in zip(texts, results):
+            _record(n, counts, error=result.error, skipped=result.skipped)
+    return counts
+
+
+def _describe(exc):
+    return f'{exc.__class__.__name__}: {exc}'
+
+
+def _record(n, counts, error='', skipped=False):
+    n.attempts += 1
+    n.last_error = error
+    if error:
+        if n.attempts >= _setting('NOTIFICATION_MAX_ATTEMPTS', 5):
+            n.state = Notification.DEAD
+            counts['dead'] += 1
+        else:
+            n.next_attempt_at = timezone.now() + retry_delay(n.attempts)
+            counts['retried'] += 1
+    else:
+        n.state = Notification.SKIPPED if skipped else Notification.SENT
+        n.sent_at = timezone.now()
+        counts['skipped' if skipped else 'sent'] += 1
+    n.save(update_fields=['state', 'attempts', 'last_error', 'next_attempt_at', 'sent_at'])
@@ -0,0 +1,142 @@
+# complaints/pagination.py
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+ADMIN_ORDERING = ('status', '-created_at', 'id')
+RECENT_ORDERING = ('-created_at', 'id')
+# Search results, best match first; `rank` is annotated by search.ranked_search()
+SEARCH_ORDERING = ('-rank', 'id')
+
+
+@dataclass
+class KeysetPage:
+    object_list: list = field(default_factory=list)
+    next_cursor: str = None
+    previous_cursor: str = None
+    per_page: int = 50
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def page_size(request):
+    default = getattr(settings, 'LISTING_PAGE_SIZE', 50)
+    limit = getattr(settings, 'LISTING_MAX_PAGE_SIZE', 200)
+    try:
+        size = int(request.GET.get('per_page', default))
+    except ValueError:
+        size = default
+    return max(1, min(size, limit))
+
+
+def encode_cursor(obj, ordering):
+    values = []
+    for name in ordering:
+        value = getattr(obj, name.lstrip('-'))
+        values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, ordering):
+    """Cursor values converted back to Python, or None if the cursor is malformed."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(ordering):
+            return None
+        return [_to_python(model, name.lstrip('-'), value) for name, value in zip(ordering, values)]
+    except (binascii.Error, ValueError, TypeError, ValidationError):
+        return None
+
+
+def _to_python(model, name, value):
+    try:
+        return model._meta.get_field(name).to_python(value)
+    except FieldDoesNotExist:
+        # An annotation such as a search rank; JSON already round-trips it
+        return value
+
+
+def seek(ordering, values, backwards):
+    """
+    Rows strictly after `values` in `ordering` (before, if backwards), spelt
+    out as (a > x) OR (a = x AND b > y) ... The redundant a >= x in front
+    gives the planner a range to start the index scan from.
+    """
+    condition = Q()
+    for i, name in enumerate(ordering):
+        descending = name.startswith('-') != backwards
+        column = name.lstrip('-')
+        branch = Q(**{prev.lstrip('-'): value for prev, value in zip(ordering[:i], values[:i])})
+        branch &= Q(**{f"{column}__{'lt' if descending else 'gt'}": values[i]})
+        condition |= branch
+    first = ordering[0]
+    descending = first.startswith('-') != backwards
+    return Q(**{f"{first.lstrip('-')}__{'lte' if descending else 'gte'}": values[0]}) & condition
+
+
+def _flip(name):
+    return name[1:] if name.startswith('-') else f'-{name}'
+
+
+def keyset_page(qs, ordering, after=None, before=None, per_page=50):
+    """
+    One page of `qs` in `ordering` (whose last field must be unique), starting
+    after the `after` cursor or ending before the `before` cursor. Each page
+    costs one LIMIT query however deep the user has navigated.
+    """
+    backwards = False
+    values = decode_cursor(after, qs.model, ordering)
+    if values is None:
+        values = decode_cursor(before, qs.model, ordering)
+        backwards = values is not None
+
+    if backwards:
+        qs = qs.order_by(*(_flip(name) for name in ordering))
+    else:
+        qs = qs.order_by(*ordering)
+    if values is not None:
+        qs = qs.filter(seek(ordering, values, backwards))
+
+    rows = list(qs[:per_page + 1])
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+        has_previous, has_next = more, True
+    else:
+        has_previous, has_next = values is not None, more
+
+    page = KeysetPage(object_list=rows, per_page=per_page)
+    if rows and has_next:
+        page.next_cursor = encode_cursor(rows[-1], ordering)
+    if rows and has_previous:
+        page.previous_cursor = encode_cursor(rows[0], ordering)
+    return page
+
+
+def paginate(request, qs, ordering):
+    return keyset_page(
+        qs, ordering,
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        per_page=page_size(request),
+    )
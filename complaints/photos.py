@@ -0,0 +1,128 @@
+# complaints/photos.py
+import io
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import Complaint
+
+# (Complaint field, setting for the longest edge, default), largest first
+RENDITIONS = (
+    ('photo_large', 'PHOTO_LARGE_SIZE', 1600),
+    ('photo_thumbnail', 'PHOTO_THUMBNAIL_SIZE', 320),
+)
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+def pending(now=None):
+    """Photos without renditions that no worker holds a live lease on."""
+    now = now or timezone.now()
+    return (
+        Complaint.objects.exclude(photo='').exclude(photo__isnull=True)
+        .filter(photo_processed_at__isnull=True)
+        .filter(Q(photo_claimed_until__isnull=True) | Q(photo_claimed_until__lt=now))
+    )
+
+
+def encode(image, fmt, quality):
+    """
+    Encode without passing exif/icc along, so GPS and device metadata from
+    the phone never reach the renditions.
+    """
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    out = io.BytesIO()
+    if fmt == 'WEBP':
+        image.save(out, 'WEBP', quality=quality, method=4)
+    else:
+        image.save(out, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def renditions(fh, fmt=None, quality=None):
+    """
+    Yield (field, bytes) for each rendition of the image in `fh`. The file is
+    decoded once, at reduced scale where the JPEG decoder allows it, rotated
+    upright from its EXIF orientation, and each smaller size is resized from
+    the previous one.
+    """
+    fmt = fmt or getattr(settings, 'PHOTO_FORMAT', 'WEBP')
+    quality = quality or getattr(settings, 'PHOTO_QUALITY', 80)
+    sizes = [(field, getattr(settings, name, default)) for field, name, default in RENDITIONS]
+    with Image.open(fh) as original:
+        original.draft('RGB', (sizes[0][1], sizes[0][1]))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+        for field, edge in sizes:
+            image.thumbnail((edge, edge), Image.LANCZOS)
+            yield field, encode(image, fmt, quality)
+
+
+def claim_photo():
+    """
+    Lease the oldest pending photo for PHOTO_LEASE seconds and return its
+    complaint, or None. Only process_photo() marks it processed, so a photo
+    whose worker dies mid-render is retried once the lease runs out.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, 'PHOTO_LEASE', 10 * 60))
+    with transaction.atomic():
+        qs = pending(now).order_by('pk')
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        complaint = qs.first()
+        if complaint is None:
+            return None
+        # Conditional on the lease still being free, for backends without row locks
+        claimed = pending(now).filter(pk=complaint.pk).update(photo_claimed_until=now + lease)
+    return complaint if claimed else None
+
+
+def process_photo(complaint):
+    """Write the renditions for one complaint; returns False and records the error if the photo is unreadable."""
+    fmt = getattr(settings, 'PHOTO_FORMAT', 'WEBP')
+    stem = os.path.splitext(os.path.basename(complaint.photo.name))[0]
+    names = {}
+    try:
+        with complaint.photo.open('rb') as fh:
+            for field, data in renditions(fh, fmt):
+                rendition = getattr(complaint, field)
+                if rendition:
+                    rendition.delete(save=False)
+                suffix = field.replace('photo_', '')
+                rendition.save(f'{complaint.pk}_{stem}_{suffix}.{EXTENSIONS[fmt]}', ContentFile(data), save=False)
+                names[field] = rendition.name
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        Complaint.objects.filter(pk=complaint.pk).update(
+            photo_error=str(exc)[:500], photo_processed_at=timezone.now(), photo_claimed_until=None
+        )
+        return False
+    # A plain UPDATE: no rollup, search or cache work for a change the dashboards never read
+    Complaint.objects.filter(pk=complaint.pk).update(
+        photo_error='', photo_processed_at=timezone.now(), photo_claimed_until=None, **names
+    )
+    return True
+
+
+def process_photos(limit=None):
+    counts = {'done': 0, 'failed': 0}
+    while limit is None or counts['done'] + counts['failed'] < limit:
+        complaint = claim_photo()
+        if complaint is None:
+            break
+        counts['done' if process_photo(complaint) else 'failed'] += 1
+    return counts
+
+
+def reset_photos():
+    """Queue every photo to be processed again, e.g. after changing the sizes or format."""
+    return Complaint.objects.exclude(photo='').exclude(photo__isnull=True).update(
+        photo_processed_at=None, photo_claimed_until=None
+    )
@@ -0,0 +1,157 @@
+# complaints/profiling.py
+import functools
+import json
+import logging
+import time
+import traceback
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import Template
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_profile', default=None)
+_templates_instrumented = False
+
+
+class Profile:
+    """Timings collected for one request; every duration is in seconds."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.sql = 0.0
+        self.queries = 0
+        self.by_sql = {}
+        self.slowest_query = 0.0
+        self.slowest_stack = []
+        self.template = 0.0
+        self.rendering = False
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sql += elapsed
+            self.queries += 1
+            count, total = self.by_sql.get(sql, (0, 0.0))
+            self.by_sql[sql] = (count + 1, total + elapsed)
+            # Only the slowest query's stack is kept, so this runs a handful of times per request
+            if elapsed > self.slowest_query:
+                self.slowest_query = elapsed
+                self.slowest_stack = project_stack()
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def top_queries(self, limit):
+        ranked = sorted(self.by_sql.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {'sql': sql[:500], 'count': count, 'ms': round(total * 1000, 2)}
+            for sql, (count, total) in ranked
+        ]
+
+    def server_timing(self):
+        return ', '.join([
+            f'total;dur={self.total * 1000:.1f}',
+            f'sql;dur={self.sql * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template * 1000:.1f}',
+        ])
+
+    def as_dict(self):
+        return {
+            'total_ms': round(self.total * 1000, 2),
+            'sql_ms': round(self.sql * 1000, 2),
+            'queries': self.queries,
+            'template_ms': round(self.template * 1000, 2),
+        }
+
+
+def project_stack():
+    """The current call stack, trimmed to this project's own frames."""
+    base = str(settings.BASE_DIR)
+    frames = [
+        f'{frame.filename}:{frame.lineno} in {frame.name}'
+        for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(base) and 'site-packages' not in frame.filename
+        and not frame.filename.endswith('profiling.py')
+    ]
+    return frames[-15:]
+
+
+def instrument_templates():
+    """
+    Wrap Django template rendering once so the outermost render() of each
+    template is timed. Includes queries that lazy querysets run while rendering.
+    """
+    global _templates_instrumented
+    if _templates_instrumented:
+        return
+    original = Template.render
+
+    @functools.wraps(original)
+    def render(self, context=None, request=None):
+        profile = _current.get()
+        if profile is None or profile.rendering:
+            return original(self, context, request)
+        profile.rendering = True
+        started = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            profile.template += time.perf_counter() - started
+            profile.rendering = False
+
+    Template.render = render
+    _templates_instrumented = True
+
+
+class RequestProfilingMiddleware:
+    """
+    Opt-in (REQUEST_PROFILING) per-request timings: query count, SQL time and
+    template render time. They are sent back as a Server-Timing header and
+    logged as one JSON line on the complaints.profiling logger. Requests slower than REQUEST_PROFILING_SLOW_MS also log their
+    heaviest queries and the stack of the slowest one. Streamed bodies are
+    not included in the total.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        instrument_templates()
+
+    def __call__(self, request):
+        profile = Profile()
+        token = _current.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.record_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        profile.finish()
+
+        if getattr(settings, 'REQUEST_PROFILING_HEADER', True):
+            response['Server-Timing'] = profile.server_timing()
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **profile.as_dict(),
+        }
+        slow_ms = getattr(settings, 'REQUEST_PROFILING_SLOW_MS', 500)
+        if slow_ms is not None and record['total_ms'] >= slow_ms:
+            record['top_queries'] = profile.top_queries(getattr(settings, 'REQUEST_PROFILING_TOP_QUERIES', 5))
+            record['slowest_query_stack'] = profile.slowest_stack
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+        return response
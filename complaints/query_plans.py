@@ -0,0 +1,64 @@
+# complaints/query_plans.py
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+
+from .models import Complaint, StatusUpdate
+from .pagination import ADMIN_ORDERING, RECENT_ORDERING, seek
+
+PAGE = 51
+
+
+def hot_queries(technician_id):
+    """(label, queryset, index the plan must use) for the listing and lookup queries in views.py."""
+    now = timezone.now()
+    return [
+        ('admin first page', Complaint.objects.order_by(*ADMIN_ORDERING)[:PAGE],
+         'complaint_status_recent_idx'),
+        ('admin next page',
+         Complaint.objects.filter(seek(ADMIN_ORDERING, ['INP', now, 0], False)).order_by(*ADMIN_ORDERING)[:PAGE],
+         'complaint_status_recent_idx'),
+        ('technician page', Complaint.objects.filter(assigned_to_id=technician_id).order_by(*RECENT_ORDERING)[:PAGE],
+         'complaint_tech_recent_idx'),
+        ('technician status count', Complaint.objects.filter(assigned_to_id=technician_id, status='INP').values('pk'),
+         'complaint_tech_status_idx'),
+        ('reports page', Complaint.objects.order_by(*RECENT_ORDERING)[:PAGE],
+         'complaint_recent_idx'),
+        ('reports by status', Complaint.objects.filter(status='NEW').order_by(*RECENT_ORDERING)[:PAGE],
+         'complaint_status_recent_idx'),
+        ('complaint timeline', StatusUpdate.objects.filter(complaint_id=1).order_by('timestamp'),
+         'statusupdate_timeline_idx'),
+    ]
+
+
+def plan_problems(plan, index):
+    problems = []
+    if index not in plan:
+        problems.append(f'does not use {index}')
+    if 'TEMP B-TREE' in plan or 'Sort Key' in plan:
+        problems.append('sorts instead of reading in index order')
+    return problems
+
+
+def seed_plan_rows(count):
+    """Insert `count` plain complaints, half assigned to one technician, and refresh the planner's statistics."""
+    technician, _ = User.objects.get_or_create(username='plan-check-technician')
+    statuses = [code for code, _ in Complaint.STATUS_CHOICES]
+    Complaint.objects.bulk_create(
+        (Complaint(name=f'Citizen {i}', contact=str(i), location='Kabale Town', description='Plan check',
+                   status=statuses[i % len(statuses)], assigned_to=technician if i % 2 else None)
+         for i in range(count)),
+        batch_size=1000,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def check_plans():
+    """(label, index, plan, problems) for every hot query against the current data."""
+    technician_id = Complaint.objects.exclude(assigned_to=None).values_list('assigned_to', flat=True).first() or 0
+    results = []
+    for label, qs, index in hot_queries(technician_id):
+        plan = qs.explain()
+        results.append((label, index, plan, plan_problems(plan, index)))
+    return results
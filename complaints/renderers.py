@@ -0,0 +1,256 @@
+# complaints/renderers.py
+import io
+import re
+import zipfile
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Table, TableStyle, Paragraph
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+from docx import Document
+from docx.enum.section import WD_ORIENT
+
+from .exports import REPORT_HEADERS
+
+
+def _counted(rows, progress, every):
+    """Pass rows through, calling progress(n) every `every` rows and at the end."""
+    n = 0
+    for n, row in enumerate(rows, 1):
+        if progress and n % every == 0:
+            progress(n)
+        yield row
+    if progress:
+        progress(n)
+
+
+# Landscape letter with half-inch margins. Column widths and row heights are
+# fixed up front so reportlab never has to measure cells to lay out a table.
+PDF_PAGE = landscape(letter)
+PDF_MARGIN = 36
+PDF_COL_WIDTHS = [36, 80, 80, 110, 90, 56, 56, 200]
+# Room for text inside each column after reportlab's default 6pt side padding
+PDF_TEXT_WIDTHS = [w - 12 for w in PDF_COL_WIDTHS]
+PDF_CELL_PADDING = 3
+# Columns clipped to one line, and columns wrapped up to a number of lines
+PDF_CLIP_COLUMNS = (0, 1, 2, 3, 5, 6)
+PDF_WRAP_COLUMNS = {4: 2, 7: 8}
+
+HEADER_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.darkblue),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.whitesmoke),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+])
+
+
+@lru_cache(maxsize=None)
+def pdf_styles():
+    """Title style, body cell style and the table style built from it; created once per process."""
+    sheet = getSampleStyleSheet()
+    cell = ParagraphStyle('ReportCell', parent=sheet['BodyText'], fontName='Helvetica', fontSize=8, leading=10)
+    body = TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('FONTNAME', (0, 0), (-1, -1), cell.fontName),
+        ('FONTSIZE', (0, 0), (-1, -1), cell.fontSize),
+        ('LEADING', (0, 0), (-1, -1), cell.leading),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('TOPPADDING', (0, 0), (-1, -1), PDF_CELL_PADDING),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), PDF_CELL_PADDING),
+    ])
+    return sheet['Title'], cell, body
+
+
+@lru_cache(maxsize=50000)
+def _word_width(word, font_name, font_size):
+    # Complaint text reuses a small vocabulary, so most widths come from here
+    return stringWidth(word, font_name, font_size)
+
+
+def _wrap(text, width, max_lines, style):
+    """Greedy word wrap to the column width, keeping at most max_lines and marking any cut with an ellipsis."""
+    space = _word_width(' ', style.fontName, style.fontSize)
+    lines, current, used = [], [], 0
+
+    def close_line():
+        line = ' '.join(current)
+        # Only a single over-long word can overflow the column
+        lines.append(_fit(line, width, style) if used > width else line)
+
+    for word in text.split():
+        w = _word_width(word, style.fontName, style.fontSize)
+        if current and used + space + w > width:
+            close_line()
+            if len(lines) == max_lines:
+                lines[-1] = _fit(lines[-1] + '\u2026', width, style)
+                return lines
+            current, used = [], 0
+        used += w + (space if current else 0)
+        current.append(word)
+    if current:
+        close_line()
+    return lines or ['']
+
+
+def _fit(text, width, style):
+    if stringWidth(text, style.fontName, style.fontSize) <= width:
+        return text
+    while text and stringWidth(text + '\u2026', style.fontName, style.fontSize) > width:
+        text = text[:-1]
+    return text + '\u2026'
+
+
+def _pdf_row(row, style):
+    """Turn a report row into table cells plus the height that row needs."""
+    cells = list(row)
+    lines = 1
+    for i in PDF_CLIP_COLUMNS:
+        cells[i] = _fit(cells[i].replace('\n', ' '), PDF_TEXT_WIDTHS[i], style)
+    for i, max_lines in PDF_WRAP_COLUMNS.items():
+        wrapped = _wrap(cells[i], PDF_TEXT_WIDTHS[i], max_lines, style)
+        cells[i] = '\n'.join(wrapped)
+        lines = max(lines, len(wrapped))
+    return cells, lines * style.leading + 2 * PDF_CELL_PADDING
+
+
+class ChunkedPdfWriter:
+    """
+    Lays complaint rows out one page at a time: rows are measured as they
+    arrive, gathered until the page is full, then drawn as a single page-sized
+    table and dropped. Only the current page's rows are kept as Python objects
+    (finished pages live on as compressed content streams until save), and
+    reportlab never has to split a table. A header row starts every page.
+    """
+
+    def __init__(self, out, title='Complaints Report'):
+        self.canv = Canvas(out, pagesize=PDF_PAGE)
+        self.title = title
+        self.width, self.height = PDF_PAGE
+        self.rows = []
+        self.heights = []
+        self.room = 0
+
+    def _start_page(self):
+        title_style, cell, body = pdf_styles()
+        x, y = PDF_MARGIN, self.height - PDF_MARGIN
+        if self.title:
+            title = Paragraph(escape(self.title), title_style)
+            _, h = title.wrapOn(self.canv, self.width - 2 * PDF_MARGIN, y)
+            title.drawOn(self.canv, x, y - h)
+            y -= h + title_style.spaceAfter
+            self.title = None
+        header = Table([list(REPORT_HEADERS)], colWidths=PDF_COL_WIDTHS, style=HEADER_STYLE)
+        _, h = header.wrapOn(self.canv, self.width - 2 * PDF_MARGIN, y)
+        header.drawOn(self.canv, x, y - h)
+        self.top = y - h
+        self.room = self.top - PDF_MARGIN
+
+    def _flush_page(self):
+        if self.rows:
+            table = Table(self.rows, colWidths=PDF_COL_WIDTHS, rowHeights=self.heights, style=pdf_styles()[2])
+            table.wrapOn(self.canv, self.width - 2 * PDF_MARGIN, self.top)
+            table.drawOn(self.canv, PDF_MARGIN, self.top - sum(self.heights))
+        self.canv.showPage()
+        self.rows, self.heights = [], []
+
+    def add_row(self, row):
+        cells, height = _pdf_row(row, pdf_styles()[1])
+        if self.rows and height > self.room:
+            self._flush_page()
+            self._start_page()
+        self.rows.append(cells)
+        self.heights.append(height)
+        self.room -= height
+
+    def write(self, rows, progress=None, progress_every=500):
+        self._start_page()
+        for row in _counted(rows, progress, progress_every):
+            self.add_row(row)
+        self._flush_page()
+        self.canv.save()
+
+
+def render_pdf(rows, out, progress=None, progress_every=500):
+    ChunkedPdfWriter(out).write(rows, progress=progress, progress_every=progress_every)
+
+
+WORD_ROW_MARKER = '@@REPORT_ROWS@@'
+# Characters XML 1.0 cannot carry; python-docx would refuse them outright
+_XML_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+_RUN_BREAKS = re.compile('([\r\n\t])')
+_TCW = re.compile(r'<w:tcW\b[^>]*/>')
+
+
+def _word_run(text):
+    """The <w:r> python-docx writes for cell.text = text."""
+    text = _XML_INVALID.sub('', text)
+    if not text:
+        return '<w:r/>'
+    parts = []
+    for piece in _RUN_BREAKS.split(text):
+        if not piece:
+            continue
+        if piece in '\r\n':
+            parts.append('<w:br/>')
+        elif piece == '\t':
+            parts.append('<w:tab/>')
+        else:
+            space = ' xml:space="preserve"' if piece[0].isspace() or piece[-1].isspace() else ''
+            parts.append(f'<w:t{space}>{escape(piece)}</w:t>')
+    return '<w:r>' + ''.join(parts) + '</w:r>'
+
+
+def render_word(rows, out, progress=None, progress_every=500):
+    """
+    python-docx builds the document shell (heading, landscape section, header
+    row) plus one placeholder row. The saved package is then copied entry by
+    entry, and the placeholder row in word/document.xml is replaced by table
+    rows written straight from string templates, so no per-cell lxml work
+    happens and rows stream into the zip rather than piling up in memory.
+    """
+    docx = Document()
+    section = docx.sections[0]
+    section.orientation = WD_ORIENT.LANDSCAPE
+    section.page_width, section.page_height = section.page_height, section.page_width
+    docx.add_heading('Complaints Report', 0)
+    table = docx.add_table(rows=1, cols=len(REPORT_HEADERS))
+    hdr = table.rows[0].cells
+    for i, h in enumerate(REPORT_HEADERS):
+        hdr[i].text = h
+    table.add_row().cells[0].text = WORD_ROW_MARKER
+    shell = io.BytesIO()
+    docx.save(shell)
+
+    with zipfile.ZipFile(shell) as zin, zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            if info.filename != 'word/document.xml':
+                zout.writestr(info, zin.read(info.filename))
+                continue
+            xml = zin.read(info.filename).decode('utf-8')
+            marker = xml.index(WORD_ROW_MARKER)
+            start = xml.rindex('<w:tr>', 0, marker)
+            end = xml.index('</w:tr>', marker) + len('</w:tr>')
+            cells = [f'<w:tc><w:tcPr>{tcw}</w:tcPr><w:p>' for tcw in _TCW.findall(xml[start:end])]
+            with zout.open(info, 'w') as fh:
+                fh.write(xml[:start].encode('utf-8'))
+                batch = []
+                for values in _counted(rows, progress, progress_every):
+                    batch.append('<w:tr>' + ''.join(
+                        cell + _word_run(value) + '</w:p></w:tc>' for cell, value in zip(cells, values)
+                    ) + '</w:tr>')
+                    if len(batch) == 500:
+                        fh.write(''.join(batch).encode('utf-8'))
+                        batch = []
+                fh.write(''.join(batch).encode('utf-8'))
+                fh.write(xml[end:].encode('utf-8'))
+
+
+RENDERERS = {
+    'pdf': render_pdf,
+    'word': render_word,
+}
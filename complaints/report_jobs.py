@@ -0,0 +1,194 @@
+# complaints/report_jobs.py
+import hashlib
+import json
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .exports import report_queryset, report_rows
+from .forms import ReportForm
+from .models import Complaint, ReportJob
+from .renderers import RENDERERS
+
+REPORT_FILTER_FIELDS = ('start_date', 'end_date', 'status', 'location')
+FILE_EXTENSIONS = {'pdf': 'pdf', 'word': 'docx'}
+
+
+def normalise_filters(cleaned_data):
+    """JSON-safe copy of ReportForm.cleaned_data, used both to store and to key jobs."""
+    cleaned_data = cleaned_data or {}
+    out = {}
+    for name in REPORT_FILTER_FIELDS:
+        value = cleaned_data.get(name)
+        if value:
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            elif hasattr(value, 'pk'):
+                value = value.pk
+            out[name] = str(value).strip()
+    return out
+
+
+def data_version():
+    """
+    Changes whenever a complaint is added, removed or edited in any way,
+    from the admin or a status change alike: one aggregate read from the
+    primary key and complaint_changes_idx.
+    """
+    agg = Complaint.objects.aggregate(n=Count('id'), last=Max('id'), changed=Max('updated_at'))
+    changed = agg['changed'].isoformat() if agg['changed'] else ''
+    return f"{agg['n']}:{agg['last'] or 0}:{changed}"
+
+
+def job_cache_key(fmt, filters, version):
+    payload = json.dumps([fmt, filters, version], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def stale_before(now=None):
+    return (now or timezone.now()) - timedelta(seconds=getattr(settings, 'REPORT_JOB_STALE_AFTER', 60 * 60))
+
+
+def submit_report_job(fmt, cleaned_data, user=None):
+    """
+    Return a job for this export, reusing a finished or in-flight one for the
+    same format, filters and data version instead of rendering it again. A
+    running job whose worker died is reused too: claim_job() picks it up
+    again once it has run for REPORT_JOB_STALE_AFTER.
+    """
+    filters = normalise_filters(cleaned_data)
+    key = job_cache_key(fmt, filters, data_version())
+
+    existing = (
+        ReportJob.objects
+        .filter(cache_key=key)
+        .exclude(state=ReportJob.FAILED)
+        .order_by('-created_at')
+        .first()
+    )
+    if existing:
+        if existing.state == ReportJob.DONE and existing.file and existing.file.storage.exists(existing.file.name):
+            return existing
+        if existing.state == ReportJob.RUNNING:
+            return existing
+        if existing.state == ReportJob.PENDING and existing.created_at >= stale_before():
+            return existing
+
+    return ReportJob.objects.create(
+        format=fmt,
+        filters=filters,
+        cache_key=key,
+        requested_by=user if user and user.is_authenticated else None,
+    )
+
+
+def claimable(now=None):
+    """Queued jobs, and running ones started more than REPORT_JOB_STALE_AFTER ago by a worker that died."""
+    return Q(state=ReportJob.PENDING) | Q(state=ReportJob.RUNNING, started_at__lt=stale_before(now))
+
+
+def claim_job():
+    """Mark the oldest claimable job as running and return it, or None."""
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            ReportJob.objects
+            .select_for_update()
+            .filter(claimable(now))
+            .order_by('created_at', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        # Conditional, so two workers cannot both take the same job
+        claimed = ReportJob.objects.filter(claimable(now), pk=job.pk).update(
+            state=ReportJob.RUNNING, started_at=now, processed_rows=0
+        )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+def run_job(job):
+    form = ReportForm(job.filters)
+    qs = report_queryset(form.cleaned_data if form.is_valid() else None)
+    total = qs.count()
+    ReportJob.objects.filter(pk=job.pk).update(total_rows=total)
+
+    def progress(n):
+        ReportJob.objects.filter(pk=job.pk).update(processed_rows=n)
+
+    renderer = RENDERERS[job.format]
+    chunk_size = getattr(settings, 'REPORT_EXPORT_CHUNK_SIZE', 2000)
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            renderer(report_rows(qs, chunk_size=chunk_size), tmp, progress=progress)
+            tmp.seek(0)
+            job.file.save(f'complaints_report_{job.pk}.{FILE_EXTENSIONS[job.format]}', File(tmp), save=False)
+    except Exception as exc:
+        ReportJob.objects.filter(pk=job.pk).update(
+            state=ReportJob.FAILED,
+            error=f'{exc.__class__.__name__}: {exc}',
+            finished_at=timezone.now(),
+        )
+        return False
+
+    ReportJob.objects.filter(pk=job.pk).update(
+        state=ReportJob.DONE,
+        file=job.file.name,
+        total_rows=total,
+        processed_rows=total,
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def process_report_jobs(limit=None):
+    """Render queued jobs until the queue is empty or `limit` jobs ran."""
+    done = failed = 0
+    while limit is None or done + failed < limit:
+        job = claim_job()
+        if job is None:
+            break
+        if run_job(job):
+            done += 1
+        else:
+            failed += 1
+    return {'done': done, 'failed': failed}
+
+
+def prune_report_jobs(now=None):
+    """
+    Delete finished jobs and their files once nobody needs them: a Ready job
+    superseded by a newer Ready one for the same format and filters (every
+    complaint edit changes the data version, so these pile up), once it is
+    REPORT_JOB_STALE_AFTER old, and any Ready or Failed job older than
+    REPORT_JOB_RETENTION. Returns the number of jobs deleted.
+    """
+    now = now or timezone.now()
+    expired = now - timedelta(seconds=getattr(settings, 'REPORT_JOB_RETENTION', 7 * 24 * 60 * 60))
+    finished = ReportJob.objects.filter(state__in=(ReportJob.DONE, ReportJob.FAILED))
+    doomed = set(finished.filter(finished_at__lt=expired).values_list('pk', flat=True))
+
+    latest = set()
+    ready = (
+        finished.filter(state=ReportJob.DONE)
+        .order_by('-finished_at', '-id')
+        .values_list('pk', 'format', 'filters', 'finished_at')
+    )
+    for pk, fmt, filters, finished_at in ready.iterator():
+        variant = (fmt, json.dumps(filters, sort_keys=True))
+        if variant not in latest:
+            latest.add(variant)
+        elif finished_at < stale_before(now):
+            doomed.add(pk)
+
+    for job in ReportJob.objects.filter(pk__in=doomed).exclude(file=''):
+        job.file.delete(save=False)
+    return ReportJob.objects.filter(pk__in=doomed).delete()[0]
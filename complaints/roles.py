@@ -0,0 +1,47 @@
+# complaints/roles.py
+from django.conf import settings
+from django.core.cache import caches
+
+MANAGER = 'Manager'
+TECHNICIAN = 'Technician'
+
+
+def _cache():
+    return caches[getattr(settings, 'ROLE_CACHE', 'default')]
+
+
+def _key(user_pk):
+    return f'roles:{user_pk}'
+
+
+def group_names(user):
+    """
+    The user's group names, read once per user object (so once per request
+    for request.user). With ROLE_CACHE_TTL they are also shared across
+    requests through the cache, which must then be one every process uses.
+    """
+    if not getattr(user, 'is_authenticated', False):
+        return frozenset()
+    names = getattr(user, '_group_names', None)
+    if names is not None:
+        return names
+    ttl = getattr(settings, 'ROLE_CACHE_TTL', 0)
+    names = _cache().get(_key(user.pk)) if ttl else None
+    if names is None:
+        names = frozenset(user.groups.values_list('name', flat=True))
+        if ttl:
+            _cache().set(_key(user.pk), names, ttl)
+    user._group_names = names
+    return names
+
+
+def is_manager(user):
+    return user.is_superuser or MANAGER in group_names(user)
+
+
+def is_technician(user):
+    return TECHNICIAN in group_names(user)
+
+
+def forget(user_pks):
+    _cache().delete_many([_key(pk) for pk in user_pks])
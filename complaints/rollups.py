@@ -0,0 +1,211 @@
+# complaints/rollups.py
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Complaint, DailyMetric
+
+
+def state_from_values(created_at, status, place_id, assigned_to_id, resolved_at):
+    """The rollup bucket a complaint counts towards, plus its resolution time in seconds."""
+    if created_at is None:
+        return None
+    resolution = None
+    if resolved_at is not None:
+        resolution = (resolved_at - created_at).total_seconds()
+    return (timezone.localdate(created_at), status, place_id, assigned_to_id, resolution)
+
+
+def complaint_state(complaint):
+    return state_from_values(*(getattr(complaint, f) for f in Complaint.ROLLUP_FIELDS))
+
+
+def stored_state(complaint):
+    """
+    The state as last read from or written to the database: the snapshot
+    Complaint.from_db() keeps, or a fresh read when the instance has none.
+    """
+    values = getattr(complaint, '_rollup_values', None)
+    if values is None and complaint.pk:
+        values = Complaint.objects.filter(pk=complaint.pk).values_list(*Complaint.ROLLUP_FIELDS).first()
+    return state_from_values(*values) if values else None
+
+
+def remember_state(complaint):
+    complaint._rollup_values = tuple(getattr(complaint, f) for f in Complaint.ROLLUP_FIELDS)
+
+
+def _bump(state, sign):
+    day, status, place_id, technician_id, seconds = state
+    resolved = 0 if seconds is None else 1
+    key = {'day': day, 'status': status, 'place_id': place_id, 'technician_id': technician_id}
+    _add(key, sign, sign * resolved, sign * (seconds or 0))
+
+
+def _add(key, count, resolved, seconds):
+    """Add the deltas to the DailyMetric row for bucket `key`, creating it for positive counts."""
+    deltas = {
+        'count': F('count') + count,
+        'resolved_count': F('resolved_count') + resolved,
+        'resolution_seconds': F('resolution_seconds') + seconds,
+    }
+    # Look the row up by pk: a deleted technician or place can leave two NULL rows for one bucket
+    pk = DailyMetric.objects.filter(**key).values_list('pk', flat=True).first()
+    if pk is not None:
+        DailyMetric.objects.filter(pk=pk).update(**deltas)
+        return
+    if count < 0:
+        return
+    try:
+        with transaction.atomic():
+            DailyMetric.objects.create(count=count, resolved_count=resolved, resolution_seconds=seconds, **key)
+    except IntegrityError:
+        DailyMetric.objects.filter(**key).update(**deltas)
+
+
+def move(old, new):
+    """Take a complaint out of bucket `old` and add it to `new`; either may be None."""
+    if old == new:
+        return
+    if old is not None:
+        _bump(old, -1)
+    if new is not None:
+        _bump(new, 1)
+
+
+def complaint_saved(complaint, old_state):
+    move(old_state, complaint_state(complaint))
+    remember_state(complaint)
+
+
+def resolution_stamped(complaint, old_state):
+    """
+    Complaint.record_status() wrote resolved_at straight to the row: move the
+    complaint from its stored bucket to the same bucket with a resolution time.
+    Unsaved edits to other fields are left for the next save() to pick up.
+    """
+    if old_state is None or old_state[4] is not None:
+        return
+    resolution = (complaint.resolved_at - complaint.created_at).total_seconds()
+    move(old_state, old_state[:4] + (resolution,))
+    values = getattr(complaint, '_rollup_values', None)
+    if values is not None:
+        i = Complaint.ROLLUP_FIELDS.index('resolved_at')
+        complaint._rollup_values = values[:i] + (complaint.resolved_at,) + values[i + 1:]
+
+
+def complaint_deleted(complaint):
+    move(stored_state(complaint), None)
+
+
+def rollup_rows(complaints=None):
+    """Aggregate complaints into DailyMetric rows (unsaved) with a single GROUP BY query."""
+    complaints = Complaint.objects.all() if complaints is None else complaints
+    resolution = ExpressionWrapper(F('resolved_at') - F('created_at'), output_field=DurationField())
+    grouped = (
+        complaints
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'status', 'place', 'assigned_to')
+        .annotate(
+            n=Count('id'),
+            resolved=Count('id', filter=Q(resolved_at__isnull=False)),
+            seconds=Sum(resolution, filter=Q(resolved_at__isnull=False)),
+        )
+        .order_by()
+    )
+    for row in grouped.iterator(chunk_size=2000):
+        yield DailyMetric(
+            day=row['day'],
+            status=row['status'],
+            place_id=row['place'],
+            technician_id=row['assigned_to'],
+            count=row['n'],
+            resolved_count=row['resolved'],
+            resolution_seconds=row['seconds'].total_seconds() if row['seconds'] else 0,
+        )
+
+
+def bucket_deltas(complaints, sign=1, deltas=None):
+    """
+    Add the rollup buckets of `complaints`, read with one aggregate query,
+    into a {(day, status, place_id, technician_id): [count, resolved, seconds]}
+    dict. With sign=-1 they are subtracted, so two calls around a bulk UPDATE
+    leave only the net change.
+    """
+    deltas = {} if deltas is None else deltas
+    for metric in rollup_rows(complaints):
+        key = (metric.day, metric.status, metric.place_id, metric.technician_id)
+        total = deltas.setdefault(key, [0, 0, 0.0])
+        total[0] += sign * metric.count
+        total[1] += sign * metric.resolved_count
+        total[2] += sign * metric.resolution_seconds
+    return deltas
+
+
+def apply_deltas(deltas):
+    """
+    Write bucket_deltas() to DailyMetric: one query reads the existing rows,
+    one bulk_update adds to them with F() expressions and one bulk_create
+    inserts the new buckets, however many buckets changed.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+    existing = {}
+    rows = DailyMetric.objects.filter(
+        day__in={key[0] for key in deltas}, status__in={key[1] for key in deltas},
+    ).order_by('pk').only('pk', 'day', 'status', 'place_id', 'technician_id')
+    for metric in rows:
+        # A deleted technician or place can leave two NULL rows for one bucket; use the first
+        existing.setdefault((metric.day, metric.status, metric.place_id, metric.technician_id), metric)
+
+    changed, new = [], []
+    for key, (count, resolved, seconds) in deltas.items():
+        metric = existing.get(key)
+        if metric is not None:
+            metric.count = F('count') + count
+            metric.resolved_count = F('resolved_count') + resolved
+            metric.resolution_seconds = F('resolution_seconds') + seconds
+            changed.append(metric)
+        elif count > 0:
+            day, status, place_id, technician_id = key
+            new.append(DailyMetric(day=day, status=status, place_id=place_id, technician_id=technician_id,
+                                   count=count, resolved_count=resolved, resolution_seconds=seconds))
+    if changed:
+        DailyMetric.objects.bulk_update(changed, ['count', 'resolved_count', 'resolution_seconds'])
+    if new:
+        try:
+            with transaction.atomic():
+                DailyMetric.objects.bulk_create(new)
+        except IntegrityError:
+            # Another process created one of the buckets first
+            for metric in new:
+                key = {'day': metric.day, 'status': metric.status, 'place_id': metric.place_id,
+                       'technician_id': metric.technician_id}
+                _add(key, metric.count, metric.resolved_count, metric.resolution_seconds)
+
+
+def add_complaints(complaints, sign=1):
+    """
+    Count complaints written without signals (bulk_create, queryset updates)
+    into the rollup with a fixed number of queries. With sign=-1 they are
+    taken out instead.
+    """
+    apply_deltas(bucket_deltas(complaints, sign))
+
+
+def rebuild_rollups(batch_size=1000):
+    """Replace every DailyMetric row with a fresh aggregate of Complaint."""
+    created = 0
+    with transaction.atomic():
+        DailyMetric.objects.all().delete()
+        batch = []
+        for metric in rollup_rows():
+            batch.append(metric)
+            if len(batch) >= batch_size:
+                created += len(DailyMetric.objects.bulk_create(batch))
+                batch = []
+        if batch:
+            created += len(DailyMetric.objects.bulk_create(batch))
+    return created
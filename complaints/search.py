@@ -0,0 +1,161 @@
+# complaints/search.py
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField, Lookup, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'complaints_complaint_fts'
+PG_INDEX = 'complaint_search_idx'
+# Keep in step with the GIN index expression below, or PostgreSQL will not use it
+PG_VECTOR = (
+    "to_tsvector('simple'::regconfig, COALESCE(complaints_complaint.location, '') "
+    "|| ' ' || COALESCE(complaints_complaint.description, ''))"
+)
+TERMS = re.compile(r'\w+', re.UNICODE)
+
+
+class FullTextDocument(TextField):
+    """The FTS5 hidden column named after its table, which MATCH is run against."""
+
+
+@FullTextDocument.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+SQLITE_INSTALL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        location, description,
+        content='complaints_complaint', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON complaints_complaint BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, location, description) VALUES (new.id, new.location, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON complaints_complaint BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, location, description)
+        VALUES ('delete', old.id, old.location, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF location, description ON complaints_complaint BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, location, description)
+        VALUES ('delete', old.id, old.location, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, location, description) VALUES (new.id, new.location, new.description);
+    END""",
+]
+SQLITE_UNINSTALL = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+PG_INSTALL = [f'CREATE INDEX IF NOT EXISTS {PG_INDEX} ON complaints_complaint USING GIN (({PG_VECTOR}))']
+PG_UNINSTALL = [f'DROP INDEX IF EXISTS {PG_INDEX}']
+
+
+def _execute(conn, statements):
+    with conn.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def install(conn=None):
+    """
+    Create the search index and, on SQLite, the triggers that keep it in step
+    with every write to complaints_complaint (including bulk and queryset
+    updates). Idempotent; also run after each migrate because SQLite drops
+    the triggers whenever a migration rebuilds the complaints table.
+    """
+    conn = conn or connection
+    if conn.vendor == 'sqlite':
+        _execute(conn, SQLITE_INSTALL)
+    elif conn.vendor == 'postgresql':
+        _execute(conn, PG_INSTALL)
+
+
+def uninstall(conn=None):
+    conn = conn or connection
+    if conn.vendor == 'sqlite':
+        _execute(conn, SQLITE_UNINSTALL)
+    elif conn.vendor == 'postgresql':
+        _execute(conn, PG_UNINSTALL)
+
+
+def rebuild(conn=None):
+    """Repopulate the index from complaints_complaint."""
+    conn = conn or connection
+    install(conn)
+    if conn.vendor == 'sqlite':
+        _execute(conn, [f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"])
+    elif conn.vendor == 'postgresql':
+        _execute(conn, [f'REINDEX INDEX {PG_INDEX}'])
+
+
+def terms(query):
+    return TERMS.findall(query.lower())
+
+
+def fts5_query(words):
+    """Every word must appear, the last one as a prefix; quoting keeps FTS5 syntax out."""
+    return ' '.join(f'"{w}"' for w in words[:-1]) + f' "{words[-1]}"*'
+
+
+def pg_query(words):
+    return ' & '.join(words[:-1] + [f'{words[-1]}:*'])
+
+
+def _icontains(words):
+    condition = Q()
+    for word in words:
+        condition &= Q(location__icontains=word) | Q(description__icontains=word)
+    return condition
+
+
+def text_filter(query):
+    """
+    A condition matching complaints whose location or description contain
+    every term of `query`; combine it with other Q objects freely. A query
+    with no word characters, such as '#' or '--', is matched as a substring.
+    """
+    words = terms(query)
+    if not words:
+        return icontains_search(query)
+    if connection.vendor == 'sqlite':
+        return Q(id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [fts5_query(words)]))
+    if connection.vendor == 'postgresql':
+        return Q(RawSQL(f"{PG_VECTOR} @@ to_tsquery('simple', %s)", [pg_query(words)], output_field=BooleanField()))
+    return _icontains(words)
+
+
+def ranked_search(qs, query):
+    """
+    `qs` narrowed to text matches and annotated with `rank`, higher for better
+    matches. On SQLite the FTS5 table is joined in, so bm25 is computed once
+    per hit in the same scan as the MATCH. Queries with no word characters
+    fall back to an unranked substring match.
+    """
+    words = terms(query)
+    if not words:
+        return qs.filter(icontains_search(query)).annotate(rank=Value(0.0, output_field=FloatField()))
+    if connection.vendor == 'sqlite':
+        # FTS5's rank is bm25(), lower for better matches; negate it to sort descending everywhere
+        return qs.filter(search_entry__document__match=fts5_query(words)).annotate(rank=-F('search_entry__rank'))
+    if connection.vendor == 'postgresql':
+        tsquery = pg_query(words)
+        return qs.filter(text_filter(query)).annotate(
+            rank=RawSQL(f"ts_rank({PG_VECTOR}, to_tsquery('simple', %s))", [tsquery], output_field=FloatField()),
+        )
+    return qs.filter(_icontains(words)).annotate(rank=Value(0.0, output_field=FloatField()))
+
+
+def icontains_search(query):
+    """
+    The previous whole-phrase LIKE '%...%' filter: the fallback for queries
+    the index has no terms for, and the baseline in benchmark_search.
+    """
+    return Q(location__icontains=query) | Q(description__icontains=query)
@@ -0,0 +1,90 @@
+# complaints/signals.py
+from django.db import transaction
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import locations, metrics_cache, roles, rollups, status_cache
+from .models import Complaint, Location, StatusUpdate
+
+
+@receiver(pre_save, sender=Complaint)
+def resolve_complaint_place(sender, instance, raw=False, **kwargs):
+    """Match place again whenever the free-text location is new or edited, e.g. in the admin."""
+    if raw:
+        return
+    if instance._state.adding:
+        changed = instance.place_id is None
+    else:
+        changed = getattr(instance, '_loaded_location', instance.location) != instance.location
+    if changed:
+        instance.place_id = locations.resolve_location_id(instance.location)
+    instance._loaded_location = instance.location
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def location_changed(sender, **kwargs):
+    # Renamed or deleted rows must not be handed out from the in-process map
+    transaction.on_commit(locations.index.clear)
+
+
+@receiver(pre_save, sender=Complaint)
+def complaint_pre_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._rollup_old_state = None if instance._state.adding else rollups.stored_state(instance)
+
+
+@receiver(post_save, sender=Complaint)
+def complaint_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    rollups.complaint_saved(instance, getattr(instance, '_rollup_old_state', None))
+
+
+@receiver(post_delete, sender=Complaint)
+def complaint_post_delete(sender, instance, **kwargs):
+    rollups.complaint_deleted(instance)
+
+
+@receiver(post_save, sender=Complaint)
+@receiver(post_delete, sender=Complaint)
+@receiver(post_save, sender=StatusUpdate)
+@receiver(post_delete, sender=StatusUpdate)
+def invalidate_metrics(sender, **kwargs):
+    # After commit, so a dashboard read racing the write cannot re-cache the old numbers
+    transaction.on_commit(metrics_cache.invalidate)
+
+
+@receiver(post_save, sender=Complaint)
+@receiver(post_delete, sender=Complaint)
+def forget_complaint_status(sender, instance, **kwargs):
+    transaction.on_commit(lambda: status_cache.forget([instance.pk]))
+
+
+@receiver(post_save, sender=StatusUpdate)
+@receiver(post_delete, sender=StatusUpdate)
+def forget_update_status(sender, instance, **kwargs):
+    transaction.on_commit(lambda: status_cache.forget([instance.complaint_id]))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def group_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            instance.__dict__.pop('_group_names', None)
+            roles.forget([instance.pk])
+    elif action == 'pre_clear':
+        instance._cleared_user_pks = list(instance.user_set.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        roles.forget(getattr(instance, '_cleared_user_pks', []))
+    elif action in ('post_add', 'post_remove'):
+        roles.forget(pk_set)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    # A rename or delete changes the role every member resolves to
+    roles.forget(instance.user_set.values_list('pk', flat=True))
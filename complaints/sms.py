@@ -0,0 +1,144 @@
+# complaints/sms.py
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+# Twilio import made optional
+try:
+    from twilio.rest import Client
+    from twilio.http.http_client import TwilioHttpClient
+except Exception:
+    Client = TwilioHttpClient = None
+
+
+@dataclass
+class SMSResult:
+    to: str
+    ok: bool
+    skipped: bool = False
+    sid: str = ''
+    error: str = ''
+
+
+class BaseSMSBackend:
+    """
+    Subclasses implement send_one(to, body) returning a message id and
+    raising on failure. send() and send_many() wrap that into SMSResults.
+    """
+    configured = True
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or getattr(settings, 'SMS_MAX_WORKERS', 8)
+
+    def send_one(self, to, body):
+        raise NotImplementedError
+
+    def send(self, to, body):
+        if not (self.configured and to):
+            return SMSResult(to=to, ok=False, skipped=True)
+        try:
+            sid = self.send_one(to, body)
+        except Exception as exc:
+            return SMSResult(to=to, ok=False, error=f'{exc.__class__.__name__}: {exc}')
+        return SMSResult(to=to, ok=True, sid=sid or '')
+
+    def send_many(self, messages):
+        """
+        Send (to, body) pairs with at most max_workers requests in flight.
+        Results come back in the same order as messages.
+        """
+        messages = list(messages)
+        if len(messages) <= 1 or self.max_workers <= 1:
+            return [self.send(to, body) for to, body in messages]
+        workers = min(self.max_workers, len(messages))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sms') as pool:
+            return list(pool.map(lambda m: self.send(*m), messages))
+
+
+class TwilioSMSBackend(BaseSMSBackend):
+    """Holds one Twilio client whose HTTP session keeps connections alive."""
+
+    def __init__(self, sid=None, token=None, from_phone=None, max_workers=None):
+        super().__init__(max_workers=max_workers)
+        self.sid = sid if sid is not None else (getattr(settings, 'TWILIO_SID', '') or '')
+        self.token = token if token is not None else (getattr(settings, 'TWILIO_AUTH_TOKEN', '') or '')
+        self.from_phone = from_phone if from_phone is not None else (getattr(settings, 'TWILIO_PHONE', '') or '')
+        self.configured = bool(Client and self.sid and self.token and self.from_phone)
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = Client(self.sid, self.token, http_client=self._http_client())
+        return self._client
+
+    def _http_client(self):
+        from requests.adapters import HTTPAdapter
+
+        http = TwilioHttpClient(pool_connections=True, timeout=getattr(settings, 'SMS_TIMEOUT', 10))
+        # Size the pool to the worker count so concurrent sends reuse sockets
+        http.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers))
+        return http
+
+    def send_one(self, to, body):
+        return self.client.messages.create(body=body, from_=self.from_phone, to=to).sid
+
+
+class LocmemSMSBackend(BaseSMSBackend):
+    """Records messages in memory instead of sending them. For tests."""
+
+    def __init__(self, max_workers=None):
+        super().__init__(max_workers=max_workers)
+        self.outbox = []
+        self.fail_for = set()
+        self._lock = threading.Lock()
+
+    def send_one(self, to, body):
+        if to in self.fail_for:
+            raise RuntimeError(f'Simulated failure for {to}')
+        with self._lock:
+            self.outbox.append({'to': to, 'body': body})
+            return f'LOC{len(self.outbox)}'
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The process-wide SMS backend named by settings.SMS_BACKEND."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, 'SMS_BACKEND', 'complaints.sms.TwilioSMSBackend')
+                _backend = import_string(path)()
+    return _backend
+
+
+def reset_backend():
+    global _backend
+    with _backend_lock:
+        _backend = None
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(setting, **kwargs):
+    if setting.startswith(('SMS_', 'TWILIO_')):
+        reset_backend()
+
+
+def send_sms(to, body):
+    return get_backend().send(to, body)
+
+
+def send_many(messages):
+    return get_backend().send_many(messages)
@@ -0,0 +1,70 @@
+# complaints/status_cache.py
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare
+
+from .models import Complaint
+
+# Cached for complaint ids that do not exist, so guessing ids is cheap too
+MISSING = 'missing'
+
+
+def _cache():
+    return caches[getattr(settings, 'STATUS_CACHE', 'default')]
+
+
+def _key(pk):
+    return f'status:{pk}'
+
+
+def _load(pk):
+    """(contact, payload, etag) for complaint `pk` from one query, or MISSING."""
+    row = (
+        Complaint.objects.filter(pk=pk)
+        .values('pk', 'contact', 'status', 'location', 'created_at', 'updated_at', 'resolved_at', 'closed_at')
+        .first()
+    )
+    if row is None:
+        return MISSING
+    payload = {
+        'id': row['pk'],
+        'status': row['status'],
+        'status_display': dict(Complaint.STATUS_CHOICES).get(row['status'], row['status']),
+        'location': row['location'],
+        'created_at': row['created_at'].isoformat(),
+        'updated_at': row['updated_at'].isoformat(),
+        'resolved_at': row['resolved_at'].isoformat() if row['resolved_at'] else None,
+        'closed_at': row['closed_at'].isoformat() if row['closed_at'] else None,
+    }
+    # Hash exactly what is sent, so any change to the payload changes the ETag
+    body = json.dumps(payload, sort_keys=True)
+    etag = '"{}"'.format(hashlib.sha256(body.encode()).hexdigest()[:20])
+    return row['contact'], payload, etag
+
+
+def complaint_status(pk, contact):
+    """
+    (payload, etag) for the citizen who knows both the id and the contact
+    used on submission, else None. Served for STATUS_CACHE_TTL seconds from
+    a cache every process must share, since forget() drops an entry when the
+    complaint or its status updates change.
+    """
+    ttl = getattr(settings, 'STATUS_CACHE_TTL', 0)
+    entry = _cache().get(_key(pk)) if ttl else None
+    if entry is None:
+        entry = _load(pk)
+        if ttl:
+            _cache().set(_key(pk), entry, ttl)
+    if entry == MISSING:
+        return None
+    stored_contact, payload, etag = entry
+    if not (contact and stored_contact and constant_time_compare(contact, stored_contact)):
+        return None
+    return payload, etag
+
+
+def forget(pks):
+    _cache().delete_many([_key(pk) for pk in pks])
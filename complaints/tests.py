@@ -0,0 +1,672 @@
+# complaints/tests.py
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from smtplib import SMTPException
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import caches
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from requests import Response
+from requests.adapters import BaseAdapter
+
+from . import metrics_cache
+from .bulk_actions import transition_complaints
+from .importer import import_complaints
+from .metrics import manager_metrics
+from .locations import resolve_location_id
+from .models import Complaint, DailyMetric, Location, Notification, ReportJob, StatusUpdate
+from .notifications import claim_batch, process_outbox, queue_email, queue_sms
+from .photos import claim_photo, process_photos
+from .query_plans import check_plans, seed_plan_rows
+from .report_jobs import claim_job, data_version, prune_report_jobs, submit_report_job
+from .rollups import rebuild_rollups, rollup_rows
+from .sms import LocmemSMSBackend, TwilioSMSBackend
+
+STATUSES = ('NEW', 'INP', 'FIX', 'CLO')
+
+
+def make_complaints(count, technician=None):
+    """
+    `count` complaints spread over the statuses, locations and the last few
+    weeks. Every other one is assigned to `technician` with a status update,
+    and Fixed/Closed ones carry their resolution timestamps. The rollup is
+    rebuilt afterwards, since created_at is backdated with a plain UPDATE.
+    """
+    now = timezone.now()
+    start = Complaint.objects.count()
+    for i in range(start, start + count):
+        status = STATUSES[i % len(STATUSES)]
+        created = now - timedelta(days=i % 40, hours=i)
+        complaint = Complaint.objects.create(
+            name=f'Citizen {i}', contact=f'+2567000{i:05d}', email=f'citizen{i}@example.com',
+            location=f'Kabale Ward {i % 3}', description='Burst pipe on the main road', status=status,
+            assigned_to=technician if i % 2 else None,
+            resolved_at=created + timedelta(days=1 + i % 5) if status in Complaint.RESOLVED_STATUSES else None,
+            closed_at=created + timedelta(days=2 + i % 5) if status == 'CLO' else None,
+        )
+        Complaint.objects.filter(pk=complaint.pk).update(created_at=created)
+        if complaint.assigned_to_id:
+            StatusUpdate.objects.create(complaint=complaint, status=status, comment=f'Update {i}')
+    rebuild_rollups()
+
+
+def rollup_table():
+    """The non-empty DailyMetric buckets, for comparing with rollup_rows()."""
+    return {
+        (m.day, m.status, m.place_id, m.technician_id, m.count, m.resolved_count, round(m.resolution_seconds))
+        for m in DailyMetric.objects.exclude(count=0)
+    }
+
+
+def expected_rollup_table():
+    return {
+        (m.day, m.status, m.place_id, m.technician_id, m.count, m.resolved_count, round(m.resolution_seconds))
+        for m in rollup_rows()
+    }
+
+
+class QueryCountTestCase(TestCase):
+    def setUp(self):
+        # Dashboard contexts and role lookups are cached; start every test cold
+        caches['default'].clear()
+        self.manager = User.objects.create_user('manager', password='x')
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.technician = User.objects.create_user('crew1', password='x')
+        self.technician.groups.add(Group.objects.get_or_create(name='Technician')[0])
+        User.objects.create_user('crew2').groups.add(Group.objects.get(name='Technician'))
+        self.client.force_login(self.manager)
+
+
+class AdminDashboardQueryTests(QueryCountTestCase):
+    def assertDashboardQueries(self, num, **params):
+        with self.assertNumQueries(num):
+            response = self.client.get(reverse('complaints:admin_dashboard'), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_grow_with_rows(self):
+        make_complaints(3, self.technician)
+        response = self.assertDashboardQueries(5)
+        self.assertEqual(len(response.context['page'].object_list), 3)
+
+        make_complaints(27, self.technician)
+        response = self.assertDashboardQueries(5)
+        self.assertEqual(len(response.context['page'].object_list), 30)
+        self.assertContains(response, 'crew1')
+        self.assertContains(response, 'Update 27')
+
+    def test_search_query_count_does_not_grow_with_rows(self):
+        make_complaints(3, self.technician)
+        self.assertDashboardQueries(5, q='burst pipe')
+        make_complaints(27, self.technician)
+        response = self.assertDashboardQueries(5, q='burst pipe')
+        self.assertEqual(len(response.context['page'].object_list), 30)
+
+    def test_query_without_words_falls_back_to_a_substring_match(self):
+        make_complaints(3, self.technician)
+        Complaint.objects.filter(pk=Complaint.objects.order_by('pk').first().pk).update(description='Meter #12 leaking')
+        for q in ('#12', '#'):
+            with self.subTest(q):
+                response = self.assertDashboardQueries(5, q=q)
+                self.assertEqual([c.description for c in response.context['page'].object_list], ['Meter #12 leaking'])
+
+
+class TechnicianDashboardQueryTests(QueryCountTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.technician)
+
+    def assertDashboardQueries(self, num, **params):
+        with self.assertNumQueries(num):
+            response = self.client.get(reverse('complaints:technician_dashboard'), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_grow_with_rows(self):
+        make_complaints(6, self.technician)
+        first = self.assertDashboardQueries(6)
+        make_complaints(60, self.technician)
+        response = self.assertDashboardQueries(6)
+        self.assertEqual(len(response.context['page'].object_list), 33)
+        self.assertNotEqual(response.context['total'], first.context['total'])
+
+    def test_status_filter_is_applied_in_the_database(self):
+        make_complaints(40, self.technician)
+        response = self.assertDashboardQueries(6, status='INP')
+        listed = response.context['page'].object_list
+        expected = Complaint.objects.filter(assigned_to=self.technician, status='INP')
+        self.assertEqual({c.pk for c in listed}, set(expected.values_list('pk', flat=True)))
+        self.assertEqual(response.context['status_label'], 'In Progress')
+        # The counters still cover every status
+        self.assertEqual(response.context['status_counts']['closed'],
+                         Complaint.objects.filter(assigned_to=self.technician, status='CLO').count())
+        self.assertContains(response, 'Show all')
+
+    def test_unknown_status_lists_everything(self):
+        make_complaints(8, self.technician)
+        response = self.client.get(reverse('complaints:technician_dashboard'), {'status': 'XYZ'})
+        self.assertEqual(len(response.context['page'].object_list), 4)
+        self.assertIsNone(response.context['status_label'])
+
+
+class ManagerMetricsQueryTests(QueryCountTestCase):
+    def test_query_count_does_not_grow_with_rows(self):
+        make_complaints(4, self.technician)
+        with self.assertNumQueries(5):
+            manager_metrics()
+        make_complaints(40, self.technician)
+        with self.assertNumQueries(5):
+            context = manager_metrics()
+        self.assertEqual(context['total'], 44)
+        self.assertEqual(sum(row['count'] for row in context['monthly']), 44)
+
+    @override_settings(METRICS_CACHE_TTL=300)
+    def test_dashboard_is_served_from_the_cache(self):
+        make_complaints(20, self.technician)
+        url = reverse('complaints:dashboard')
+        metrics_cache.invalidate()
+        # Session, user, groups, then the metrics themselves
+        with self.assertNumQueries(8):
+            cold = self.client.get(url)
+        with self.assertNumQueries(3):
+            warm = self.client.get(url)
+        self.assertEqual(cold.context['total'], 20)
+        # Closed counts Fixed and Closed complaints that were assigned: the five Closed ones here
+        self.assertEqual(cold.context['breakdown'], {'new': 5, 'in_progress': 5, 'fixed': 5, 'closed': 5})
+        self.assertEqual(warm.context['breakdown'], cold.context['breakdown'])
+
+    @override_settings(METRICS_CACHE_TTL=0)
+    def test_dashboard_is_computed_per_request_without_a_ttl(self):
+        make_complaints(4, self.technician)
+        url = reverse('complaints:dashboard')
+        for _ in range(2):
+            with self.assertNumQueries(8):
+                self.client.get(url)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'The expected plans are SQLite EXPLAIN QUERY PLAN output')
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_plan_rows(3000)
+
+    def test_hot_queries_use_their_indexes(self):
+        for label, index, plan, problems in check_plans():
+            with self.subTest(label):
+                self.assertEqual(problems, [], f'{label} ({index}):\n{plan}')
+
+
+class ReportDataVersionTests(TestCase):
+    def test_version_changes_when_an_exported_column_is_edited(self):
+        make_complaints(3)
+        before = data_version()
+        complaint = Complaint.objects.order_by('pk').first()
+        complaint.location = 'Kabale Town'
+        complaint.save()
+        self.assertNotEqual(data_version(), before)
+
+    def test_version_is_stable_without_changes(self):
+        make_complaints(3)
+        self.assertEqual(data_version(), data_version())
+
+
+@override_settings(REPORT_JOB_STALE_AFTER=3600, REPORT_JOB_RETENTION=7 * 24 * 3600)
+class ReportJobTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def finished_job(self, name, hours_ago, filters=None):
+        job = ReportJob.objects.create(format='pdf', filters=filters or {}, cache_key=name, state=ReportJob.DONE)
+        job.file.save(f'{name}.pdf', ContentFile(b'%PDF'), save=False)
+        job.finished_at = timezone.now() - timedelta(hours=hours_ago)
+        job.save()
+        return job
+
+    def test_running_job_of_a_dead_worker_is_claimed_again(self):
+        job = submit_report_job('pdf', {})
+        self.assertEqual(claim_job().pk, job.pk)
+        # Still rendering: neither claimed twice nor resubmitted
+        self.assertIsNone(claim_job())
+        self.assertEqual(submit_report_job('pdf', {}).pk, job.pk)
+
+        ReportJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(submit_report_job('pdf', {}).pk, job.pk)
+        reclaimed = claim_job()
+        self.assertEqual(reclaimed.pk, job.pk)
+        self.assertGreater(reclaimed.started_at, timezone.now() - timedelta(minutes=1))
+        self.assertIsNone(claim_job())
+
+    def test_prune_deletes_superseded_and_expired_reports(self):
+        old = self.finished_job('old', hours_ago=3)
+        recent = self.finished_job('recent', hours_ago=0.5)
+        newest = self.finished_job('newest', hours_ago=0.1)
+        other = self.finished_job('other', hours_ago=5, filters={'status': 'NEW'})
+        expired = self.finished_job('expired', hours_ago=8 * 24, filters={'status': 'CLO'})
+        files = {job.pk: job.file.path for job in (old, recent, newest, other, expired)}
+
+        self.assertEqual(prune_report_jobs(), 2)
+        kept = set(ReportJob.objects.values_list('pk', flat=True))
+        # Superseded reports within REPORT_JOB_STALE_AFTER stay downloadable
+        self.assertEqual(kept, {recent.pk, newest.pk, other.pk})
+        for pk, path in files.items():
+            self.assertEqual(os.path.exists(path), pk in kept)
+
+
+class StatusJsonTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        make_complaints(1)
+        self.complaint = Complaint.objects.get()
+        self.url = reverse('complaints:status_json', args=[self.complaint.pk])
+        self.params = {'contact': self.complaint.contact}
+
+    @override_settings(STATUS_CACHE_TTL=60)
+    def test_unchanged_complaint_answers_304_from_the_cache(self):
+        etag = self.client.get(self.url, self.params)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, self.params, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(STATUS_CACHE_TTL=0)
+    def test_without_a_ttl_every_poll_reads_the_row(self):
+        etag = self.client.get(self.url, self.params)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, self.params, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        # Nothing was cached for another process to serve stale
+        self.assertIsNone(caches['default'].get(f'status:{self.complaint.pk}'))
+
+    @override_settings(STATUS_CACHE_TTL=60)
+    def test_location_edit_changes_the_etag(self):
+        etag = self.client.get(self.url, self.params)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.complaint.location = 'Kabale Town'
+            self.complaint.save()
+        response = self.client.get(self.url, self.params, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['location'], 'Kabale Town')
+
+
+@override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SLOW_MS=None, STATUS_CACHE_TTL=0)
+class RequestProfilingTests(TestCase):
+    def test_timings_are_sent_and_logged(self):
+        make_complaints(1)
+        complaint = Complaint.objects.get()
+        url = reverse('complaints:status_json', args=[complaint.pk])
+        with self.assertLogs('complaints.profiling', 'INFO') as logs, self.assertNumQueries(1):
+            response = self.client.get(url, {'contact': complaint.contact})
+        self.assertEqual(response.status_code, 200)
+        names = [part.split(';')[0] for part in response['Server-Timing'].split(', ')]
+        self.assertEqual(names, ['total', 'sql', 'tpl'])
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['queries'], 1)
+        self.assertEqual(record['path'], url)
+        self.assertEqual(record['status'], 200)
+
+
+class PhotoLeaseTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        out = io.BytesIO()
+        Image.new('RGB', (800, 600), (200, 30, 30)).save(out, 'JPEG')
+        self.complaint = Complaint.objects.create(
+            name='Citizen', contact='+256700000000', location='Kabale Town', description='Leak',
+            photo=SimpleUploadedFile('leak.jpg', out.getvalue(), content_type='image/jpeg'),
+        )
+
+    def test_claimed_photo_is_not_marked_processed(self):
+        self.assertEqual(claim_photo().pk, self.complaint.pk)
+        self.complaint.refresh_from_db()
+        self.assertIsNone(self.complaint.photo_processed_at)
+        # Leased: no second worker takes it
+        self.assertIsNone(claim_photo())
+
+    def test_photo_of_a_dead_worker_is_retried_after_the_lease(self):
+        claim_photo()
+        Complaint.objects.filter(pk=self.complaint.pk).update(photo_claimed_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(process_photos(), {'done': 1, 'failed': 0})
+        self.complaint.refresh_from_db()
+        self.assertTrue(self.complaint.photo_thumbnail)
+        self.assertIsNotNone(self.complaint.photo_processed_at)
+        self.assertIsNone(self.complaint.photo_claimed_until)
+        self.assertIsNone(claim_photo())
+
+
+class LocationTests(TestCase):
+    def submit(self, location):
+        response = self.client.post(reverse('complaints:create'), {
+            'name': 'Citizen', 'contact': '+256700000000', 'location': location, 'description': 'Leak',
+        })
+        self.assertEqual(response.status_code, 302)
+        return Complaint.objects.latest('pk')
+
+    def test_deleted_location_is_not_handed_out_again(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.submit('Kabale Town')
+        # Deleted without this process hearing of it, as from another worker
+        Location.objects.filter(pk=first.place_id).delete()
+        second = self.submit('Kabale Town')
+        connection.check_constraints()
+        self.assertIsNotNone(second.place_id)
+        self.assertNotEqual(second.place_id, first.place_id)
+        self.assertEqual(second.place.name, 'Kabale Town')
+
+    def test_numbered_places_are_kept_apart(self):
+        ward1 = resolve_location_id('Kigezi Ward 1')
+        ward2 = resolve_location_id('Kigezi Ward 2')
+        self.assertNotEqual(ward1, ward2)
+        self.assertIsNone(Location.objects.get(pk=ward2).similar_to_id)
+
+    def test_editing_the_location_moves_the_place_and_rollup(self):
+        complaint = self.submit('Kabale Town')
+        complaint.location = 'Nyabikoni A'
+        complaint.save()
+        complaint.refresh_from_db()
+        self.assertEqual(complaint.place.name, 'Nyabikoni A')
+        self.assertEqual(rollup_table(), expected_rollup_table())
+
+
+@override_settings(NOTIFICATION_RETRY_DELAY=60, NOTIFICATION_MAX_DELAY=3600, NOTIFICATION_MAX_ATTEMPTS=3,
+                   NOTIFICATION_LEASE=300)
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.notification = queue_email('citizen@example.com', 'Complaint Received', 'We got it.')
+
+    def test_pending_email_is_sent(self):
+        self.assertEqual(process_outbox(), {'sent': 1, 'skipped': 0, 'retried': 0, 'dead': 0})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['citizen@example.com'])
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.state, Notification.SENT)
+        self.assertEqual(self.notification.attempts, 1)
+        self.assertIsNotNone(self.notification.sent_at)
+        # Nothing left to send
+        self.assertEqual(process_outbox()['sent'], 0)
+
+    def test_failed_send_is_retried_with_backoff_then_dead(self):
+        with mock.patch('complaints.notifications.send_mail', side_effect=SMTPException('mailbox unavailable')):
+            delays = []
+            for attempt in range(1, 4):
+                before = timezone.now()
+                counts = process_outbox(now=before + timedelta(days=attempt))
+                self.notification.refresh_from_db()
+                self.assertEqual(self.notification.attempts, attempt)
+                self.assertIn('mailbox unavailable', self.notification.last_error)
+                if attempt < 3:
+                    self.assertEqual(counts['retried'], 1)
+                    self.assertEqual(self.notification.state, Notification.PENDING)
+                    delays.append(round((self.notification.next_attempt_at - before).total_seconds() / 60))
+            self.assertEqual(delays, [1, 2])
+            self.assertEqual(counts['dead'], 1)
+            self.assertEqual(self.notification.state, Notification.DEAD)
+            self.assertEqual(process_outbox(now=timezone.now() + timedelta(days=30))['dead'], 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_leased_rows_are_not_claimed_twice(self):
+        now = timezone.now()
+        self.assertEqual([n.pk for n in claim_batch(10, now=now)], [self.notification.pk])
+        self.assertEqual(claim_batch(10, now=now), [])
+        self.assertEqual(claim_batch(10, now=now + timedelta(seconds=299)), [])
+        # A worker that died holding the lease: the row comes back once it runs out
+        self.assertEqual(len(claim_batch(10, now=now + timedelta(seconds=301))), 1)
+
+
+class SMSOutboxTests(TestCase):
+    def test_sent_and_failed_messages_are_recorded(self):
+        backend = LocmemSMSBackend(max_workers=4)
+        backend.fail_for.add('+256700000002')
+        ok = queue_sms('+256700000001', 'Your complaint #1 status is now Fixed.')
+        failing = queue_sms('+256700000002', 'Your complaint #2 status is now Fixed.')
+        self.assertIsNone(queue_sms('', 'No number, nothing queued'))
+
+        self.assertEqual(process_outbox(sms_backend=backend), {'sent': 1, 'skipped': 0, 'retried': 1, 'dead': 0})
+        self.assertEqual(backend.outbox, [{'to': '+256700000001', 'body': 'Your complaint #1 status is now Fixed.'}])
+        ok.refresh_from_db()
+        failing.refresh_from_db()
+        self.assertEqual(ok.state, Notification.SENT)
+        self.assertEqual(failing.state, Notification.PENDING)
+        self.assertIn('Simulated failure', failing.last_error)
+        self.assertGreater(failing.next_attempt_at, timezone.now())
+
+    def test_unconfigured_gateway_skips(self):
+        backend = LocmemSMSBackend()
+        backend.configured = False
+        notification = queue_sms('+256700000001', 'Hello')
+        self.assertEqual(process_outbox(sms_backend=backend)['skipped'], 1)
+        notification.refresh_from_db()
+        self.assertEqual(notification.state, Notification.SKIPPED)
+
+
+class StubTwilioAdapter(BaseAdapter):
+    """Answers Twilio's Messages API in place of the network; numbers ending in 9 are rejected."""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        to = dict(item.split('=', 1) for item in request.body.split('&'))['To']
+        response = Response()
+        response.request = request
+        response.headers['Content-Type'] = 'application/json'
+        if to.endswith('9'):
+            response.status_code = 400
+            response._content = b'{"code": 21211, "message": "Invalid To number", "status": 400}'
+        else:
+            response.status_code = 201
+            response._content = b'{"sid": "SM%d", "status": "queued"}' % len(self.requests)
+        return response
+
+    def close(self):
+        pass
+
+
+class TwilioBackendTests(TestCase):
+    def test_send_many_isolates_failures_per_message(self):
+        backend = TwilioSMSBackend(sid='AC' + '0' * 32, token='secret', from_phone='+15005550006', max_workers=4)
+        adapter = StubTwilioAdapter()
+        backend.client.http_client.session.mount('https://', adapter)
+
+        results = backend.send_many([
+            ('+256700000001', 'one'), ('+256700000009', 'two'), ('+256700000003', 'three'), ('', 'four'),
+        ])
+        self.assertEqual([r.ok for r in results], [True, False, True, False])
+        self.assertTrue(all(r.sid.startswith('SM') for r in (results[0], results[2])))
+        self.assertIn('Invalid To number', results[1].error)
+        self.assertTrue(results[3].skipped)
+        # The blank number never reaches the gateway
+        self.assertEqual(len(adapter.requests), 3)
+
+
+class BulkTransitionTests(TestCase):
+    def setUp(self):
+        self.technician = User.objects.create_user('crew1')
+        earlier = timezone.now() - timedelta(days=3)
+        self.new = Complaint.objects.create(location='Kabale Town', description='Leak', email='a@example.com')
+        self.no_email = Complaint.objects.create(location='Kigezi Ward 1', description='Leak')
+        self.in_progress = Complaint.objects.create(location='Kabale Town', description='Leak',
+                                                    email='b@example.com', status='INP')
+        # Fixed once, then reopened: keeps its first resolution time
+        self.reopened = Complaint.objects.create(location='Nyabikoni A', description='Leak', email='c@example.com',
+                                                 status='INP', resolved_at=earlier)
+        self.fixed = Complaint.objects.create(location='Kabale Town', description='Leak', email='d@example.com',
+                                              status='FIX', resolved_at=earlier)
+        self.earlier = earlier
+
+    def test_assign_and_fix_a_mixed_selection(self):
+        ids = [self.new.pk, self.no_email.pk, self.in_progress.pk, self.reopened.pk, self.fixed.pk, 999999]
+        updated, skipped = transition_complaints(ids, technician=self.technician)
+        self.assertEqual(updated, sorted([self.new.pk, self.no_email.pk, self.in_progress.pk, self.reopened.pk]))
+        self.assertEqual(skipped, sorted([self.fixed.pk, 999999]))
+        self.assertEqual(rollup_table(), expected_rollup_table())
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertEqual(StatusUpdate.objects.filter(complaint__assigned_to=self.technician).count(), 4)
+
+        updated, skipped = transition_complaints(ids, status='FIX', comment='Repaired')
+        self.assertEqual(len(updated), 4)
+        self.assertEqual(rollup_table(), expected_rollup_table())
+        self.assertEqual(Notification.objects.count(), 6)
+        self.reopened.refresh_from_db()
+        self.new.refresh_from_db()
+        self.assertEqual(self.reopened.resolved_at, self.earlier)
+        self.assertGreater(self.new.resolved_at, self.earlier)
+        self.assertIsNone(self.new.closed_at)
+
+        # Now all resolved: nothing is left to move
+        self.assertEqual(transition_complaints(ids, status='CLO'), ([], sorted(ids)))
+        self.assertEqual(rollup_table(), expected_rollup_table())
+
+    def test_already_in_target_status(self):
+        stamp = Complaint.objects.filter(pk=self.in_progress.pk).values_list('updated_at', flat=True).get()
+        updated, skipped = transition_complaints([self.in_progress.pk], status='INP')
+        self.assertEqual((updated, skipped), ([self.in_progress.pk], []))
+        self.in_progress.refresh_from_db()
+        self.assertEqual(self.in_progress.status, 'INP')
+        self.assertGreaterEqual(self.in_progress.updated_at, stamp)
+        self.assertEqual(rollup_table(), expected_rollup_table())
+
+
+IMPORT_CSV = """name,contact,email,location,description,status,created_at,resolved_at,closed_at
+Amina,+256700000001,amina@example.com,Kabale Town,Burst pipe,New,2025-03-01 08:00,,
+Brian,+256700000002,,Kigezi Ward 1,No water,FIX,2025-03-02,2025-03-04,
+Carol,+256700000003,carol@example.com,Kigezi Ward 2,Leak,Closed,2025-03-03,2025-03-05,2025-03-06
+Dan,+256700000004,dan@example.com,Kabale Town,Leak,FIX,2025-03-10,2025-03-08,
+Eve,+256700000005,eve@example.com,Kabale Town,Leak,INP,2025-03-10,,2025-03-12
+Fay,+256700000006,not-an-email,,Leak,Closed,2025-03-10,2025-03-12,2025-03-11
+"""
+
+
+class ImporterTests(TestCase):
+    def run_import(self, **kwargs):
+        return import_complaints(io.StringIO(IMPORT_CSV), batch_size=2, **kwargs)
+
+    def test_valid_rows_are_imported_and_bad_rows_reported(self):
+        result = self.run_import(initial_updates=True)
+        self.assertEqual((result.read, result.imported), (6, 3))
+        errors = dict(result.errors)
+        self.assertEqual(sorted(errors), [5, 6, 7])
+        self.assertIn('resolved_at: earlier than created_at', errors[5])
+        self.assertIn('closed_at: only Closed complaints have one', errors[6])
+        self.assertIn('email', errors[7])
+        self.assertIn('location', errors[7])
+        self.assertIn('closed_at: earlier than resolved_at', errors[7])
+
+        carol = Complaint.objects.get(name='Carol')
+        self.assertEqual((carol.status, timezone.localdate(carol.created_at).isoformat()), ('CLO', '2025-03-03'))
+        self.assertEqual(timezone.localdate(carol.closed_at).isoformat(), '2025-03-06')
+        self.assertEqual(carol.place.name, 'Kigezi Ward 2')
+        self.assertEqual(StatusUpdate.objects.get(complaint=carol).timestamp, carol.created_at)
+        # Imports queue nothing for the citizens
+        self.assertFalse(Notification.objects.exists())
+
+    def test_rollup_matches_a_rebuild(self):
+        make_complaints(5)
+        self.run_import()
+        self.assertEqual(rollup_table(), expected_rollup_table())
+        self.assertTrue(all(seconds >= 0 for *_, seconds in rollup_table()))
+
+    def test_dry_run_writes_nothing(self):
+        result = self.run_import(dry_run=True)
+        self.assertEqual(result.imported, 3)
+        self.assertFalse(Complaint.objects.exists())
+        self.assertFalse(Location.objects.exists())
+
+
+@override_settings(CHANGES_FEED_TOKENS=['feed-token'], CHANGES_FEED_SETTLE=0)
+class ChangesFeedTests(TestCase):
+    def setUp(self):
+        make_complaints(7, User.objects.create_user('crew1'))
+        # Ties on updated_at are broken by id; make every row tie
+        Complaint.objects.update(updated_at=timezone.now() - timedelta(minutes=10))
+
+    def pull(self, cursor='', limit=None, token='feed-token'):
+        params = {'cursor': cursor}
+        if limit is not None:
+            params['limit'] = limit
+        response = self.client.get(reverse('complaints:changes_feed'), params,
+                                   headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(lines[-1]['type'], 'cursor')
+        return lines[:-1], lines[-1]
+
+    def pull_all(self, cursor='', limit=2):
+        rows = []
+        while True:
+            page, end = self.pull(cursor, limit)
+            rows += page
+            cursor = end['cursor']
+            if not end['more']:
+                return rows, cursor
+
+    def test_token_is_required(self):
+        url = reverse('complaints:changes_feed')
+        for headers in ({}, {'Authorization': 'Bearer wrong'}, {'Authorization': 'Basic feed-token'}):
+            with self.subTest(headers=headers):
+                response = self.client.get(url, headers=headers)
+                self.assertEqual(response.status_code, 401)
+                self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+
+    def test_malformed_cursor_or_limit_is_rejected(self):
+        url = reverse('complaints:changes_feed')
+        headers = {'Authorization': 'Bearer feed-token'}
+        for params in ({'cursor': 'not a cursor'}, {'cursor': 'eyJjIjogWyJ4IiwgMV19'}, {'limit': 'many'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, params, headers=headers).status_code, 400)
+
+    def test_pages_continue_without_gaps_or_repeats(self):
+        rows, cursor = self.pull_all(limit=2)
+        complaints = [row['id'] for row in rows if row['type'] == 'complaint']
+        updates = [row['id'] for row in rows if row['type'] == 'status_update']
+        self.assertEqual(complaints, list(Complaint.objects.order_by('updated_at', 'id').values_list('pk', flat=True)))
+        self.assertEqual(updates, list(StatusUpdate.objects.order_by('pk').values_list('pk', flat=True)))
+        # Caught up: only the cursor comes back
+        self.assertEqual(self.pull(cursor), ([], {'type': 'cursor', 'cursor': cursor, 'more': False}))
+
+    def test_changes_after_the_cursor_are_sent_once(self):
+        rows, cursor = self.pull_all(limit=3)
+        complaint = Complaint.objects.order_by('pk').first()
+        complaint.location = 'Kabale Town'
+        complaint.save()
+        update = StatusUpdate.objects.create(complaint=complaint, status='FIX', comment='Repaired')
+        rows, cursor = self.pull_all(cursor, limit=3)
+        self.assertEqual([(row['type'], row['id']) for row in rows],
+                         [('complaint', complaint.pk), ('status_update', update.pk)])
+        self.assertEqual(rows[0]['location'], 'Kabale Town')
+        self.assertEqual(rows[1]['comment'], 'Repaired')
+
+    @override_settings(CHANGES_FEED_SETTLE=60)
+    def test_recent_changes_wait_for_the_settle_window(self):
+        rows, cursor = self.pull_all(limit=50)
+        complaint = Complaint.objects.order_by('pk').first()
+        complaint.description = 'Still leaking'
+        complaint.save()
+        self.assertEqual(self.pull(cursor)[0], [])
+        # Once it is older than the window it is sent, behind the same cursor
+        Complaint.objects.filter(pk=complaint.pk).update(updated_at=timezone.now() - timedelta(seconds=61))
+        rows, _ = self.pull(cursor)
+        self.assertEqual([row['id'] for row in rows], [complaint.pk])
@@ -0,0 +1,130 @@
+# complaints/uploads.py
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers
+from django.template.defaultfilters import filesizeformat
+
+# Leading bytes of each accepted format; WebP is RIFF....WEBP
+SIGNATURES = {
+    'jpeg': (b'\xff\xd8\xff',),
+    'png': (b'\x89PNG\r\n\x1a\n',),
+    'gif': (b'GIF87a', b'GIF89a'),
+}
+SNIFF_BYTES = 12
+TOO_LARGE = 'Photos must be {size} or smaller.'
+NOT_AN_IMAGE = 'Upload a JPEG, PNG or WebP photo.'
+
+
+def sniff(head):
+    """The image format `head` starts with, or None."""
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    for kind, prefixes in SIGNATURES.items():
+        if head.startswith(prefixes):
+            return kind
+    return None
+
+
+def max_size():
+    return getattr(settings, 'PHOTO_UPLOAD_MAX_SIZE', 10 * 1024 * 1024)
+
+
+def allowed_types():
+    return getattr(settings, 'PHOTO_UPLOAD_TYPES', ('jpeg', 'png', 'webp'))
+
+
+def photo_digest(upload):
+    """SHA-256 of an uploaded file: the one hashed while streaming, or computed now for other handlers."""
+    digest = getattr(upload, 'sha256', None)
+    if digest:
+        return digest
+    sha = hashlib.sha256()
+    for chunk in upload.chunks():
+        sha.update(chunk)
+    upload.seek(0)
+    return sha.hexdigest()
+
+
+def rejections(request):
+    """Field name -> message for photos the upload handler refused on this request."""
+    return getattr(request, 'upload_rejections', {})
+
+
+class PhotoUploadHandler(FileUploadHandler):
+    """
+    Streams photo fields straight to a temporary file while checking them:
+    the declared type and size before any data, the magic bytes on the first
+    chunk and the running size on every chunk. A file that fails is dropped
+    at that point rather than after it has been fully stored, and the reason
+    is left on the request for the form; the rest of that part is read and
+    thrown away so the other form fields still arrive. A SHA-256 of the content is kept on
+    the uploaded file as `sha256` so duplicates are found without reading it
+    again. Other file fields pass through to the next handler.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.active = False
+
+    def reject(self, field_name, message):
+        self.active = False
+        if self.request is not None:
+            if not hasattr(self.request, 'upload_rejections'):
+                self.request.upload_rejections = {}
+            self.request.upload_rejections[field_name] = message
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.active = field_name in getattr(settings, 'PHOTO_UPLOAD_FIELDS', ('photo',))
+        if not self.active:
+            return
+        if content_type and not content_type.startswith('image/'):
+            self.reject(self.field_name, NOT_AN_IMAGE)
+            raise SkipFile
+        if content_length and content_length > max_size():
+            self.reject(self.field_name, TOO_LARGE.format(size=filesizeformat(max_size())))
+            raise SkipFile
+        self.file = TemporaryUploadedFile(file_name, content_type, 0, charset, content_type_extra)
+        self.digest = hashlib.sha256()
+        self.head = b''
+        self.size = 0
+        raise StopFutureHandlers
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        self.size += len(raw_data)
+        if self.size > max_size():
+            self.discard()
+            self.reject(self.field_name, TOO_LARGE.format(size=filesizeformat(max_size())))
+            raise SkipFile
+        if self.head is not None:
+            self.head += raw_data[:SNIFF_BYTES]
+            if len(self.head) >= SNIFF_BYTES:
+                if sniff(self.head) not in allowed_types():
+                    self.discard()
+                    self.reject(self.field_name, NOT_AN_IMAGE)
+                    raise SkipFile
+                self.head = None
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        self.active = False
+        # Files shorter than SNIFF_BYTES are left for the form's image validation to refuse
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.digest.hexdigest()
+        return self.file
+
+    def discard(self):
+        self.file.close()
+
+    def upload_interrupted(self):
+        if self.active:
+            self.discard()
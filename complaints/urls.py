@@ -8,11 +8,16 @@ urlpatterns = [
     path('', views.complaint_create, name='create'),
     path('submitted/<int:pk>/', views.complaint_submitted, name='complaint_submitted'),
     path('lookup/', views.status_lookup, name='status_lookup'),
+    path('lookup/<int:pk>/status.json', views.status_json, name='status_json'),
     path('metrics/', views.dashboard, name='dashboard'),
+    path('metrics/cache/', views.metrics_cache_stats, name='metrics_cache_stats'),
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('technician/', views.technician_dashboard, name='technician_dashboard'),
     path('update/<int:pk>/', views.complaint_update, name='complaint_update'),
     path('reports/', views.reports, name='reports'),
+    path('reports/jobs/<int:pk>/', views.report_job, name='report_job'),
+    path('reports/jobs/<int:pk>/download/', views.report_job_download, name='report_job_download'),
+    path('api/changes/', views.changes_feed, name='changes_feed'),
     path('login/', views.RoleLoginView.as_view(), name='login'),
     path('logout/', views.RoleLogoutView.as_view(), name='logout'),
 ]
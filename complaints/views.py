@@ -1,57 +1,30 @@
 # complaints/views.py
-import csv
-import io
-from statistics import median
-
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET
 from django.urls import reverse
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib import messages
 from django.conf import settings
-from django.core.mail import send_mail
-from django.db.models import Q, Count, F, ExpressionWrapper, DurationField
-from django.db.models.functions import TruncMonth
+from django.db.models import OuterRef, Q, Subquery
 from django.contrib.auth.models import User
 
-# Twilio import made optional
-try:
-    from twilio.rest import Client
-except Exception:
-    Client = None
-
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.lib.styles import getSampleStyleSheet
-
-from docx import Document
-from docx.enum.section import WD_ORIENT
-
-from .models import Complaint, StatusUpdate
+from .models import Complaint, StatusUpdate, ReportJob
 from .forms import ComplaintForm, StatusUpdateForm, LookupForm, ReportForm
-
-
-def send_sms(to, body):
-    sid = getattr(settings, 'TWILIO_SID', '') or ''
-    token = getattr(settings, 'TWILIO_AUTH_TOKEN', '') or ''
-    from_phone = getattr(settings, 'TWILIO_PHONE', '') or ''
-    if not (Client and sid and token and from_phone and to):
-        return
-    try:
-        client = Client(sid, token)
-        client.messages.create(body=body, from_=from_phone, to=to)
-    except Exception:
-        return
-
-
-def is_manager(user):
-    return user.is_superuser or user.groups.filter(name='Manager').exists()
-
-
-def is_technician(user):
-    return user.groups.filter(name='Technician').exists()
+from .exports import csv_response, report_queryset
+from . import metrics_cache
+from .bulk_actions import BULK_STATUSES, transition_complaints
+from .changes import feed_lines, token_allowed
+from .metrics import cached_manager_metrics, cached_technician_metrics
+from .notifications import queue_email, queue_sms
+from .pagination import ADMIN_ORDERING, RECENT_ORDERING, SEARCH_ORDERING, paginate
+from .search import ranked_search, text_filter
+from .status_cache import complaint_status
+from .report_jobs import FILE_EXTENSIONS, submit_report_job
+from .roles import is_manager, is_technician
+from .uploads import rejections
 
 
 class RoleLoginView(LoginView):
@@ -85,22 +58,20 @@ def complaint_create(request):
         return role_redirect(request)
 
     if request.method == 'POST':
-        form = ComplaintForm(request.POST, request.FILES)
+        form = ComplaintForm(request.POST, request.FILES, upload_rejections=rejections(request))
         if form.is_valid():
             comp = form.save()
             if comp.email:
                 lookup_url = request.build_absolute_uri(reverse('complaints:status_lookup'))
-                send_mail(
+                queue_email(
+                    comp.email,
                     'Complaint Received',
                     f'Your complaint has been received.\n\n'
                     f'Complaint ID: {comp.id}\n'
                     f'Check status: {lookup_url}',
-                    settings.DEFAULT_FROM_EMAIL,
-                    [comp.email],
-                    fail_silently=False,
                 )
             if comp.contact:
-                send_sms(
+                queue_sms(
                     comp.contact,
                     f'Complaint #{comp.id} received. Use your ID to check status online.'
                 )
@@ -137,64 +108,119 @@ def status_lookup(request):
     })
 
 
+@require_GET
+def status_json(request, pk):
+    """
+    Citizen status polling: GET with ?contact=. Answers from the status cache
+    and with 304 Not Modified while the ETag still matches.
+    """
+    found = complaint_status(pk, request.GET.get('contact', '').strip())
+    if found is None:
+        return JsonResponse({'error': 'No matching complaint found.'}, status=404)
+    payload, etag = found
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(payload)
+    response['ETag'] = etag
+    # The answer depends on the contact in the URL: browsers may keep it but must revalidate
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@require_GET
+def changes_feed(request):
+    """
+    NDJSON of complaints and status updates changed since ?cursor=, for
+    downstream systems. Needs a CHANGES_FEED_TOKENS bearer token.
+    """
+    if not token_allowed(request):
+        response = JsonResponse({'error': 'A valid bearer token is required.'}, status=401)
+        response['WWW-Authenticate'] = 'Bearer'
+        return response
+    limit = getattr(settings, 'CHANGES_FEED_LIMIT', 5000)
+    try:
+        limit = max(1, min(int(request.GET.get('limit', limit)), getattr(settings, 'CHANGES_FEED_MAX_LIMIT', 50000)))
+        lines = feed_lines(request.GET.get('cursor', ''), limit=limit)
+    except ValueError:
+        return JsonResponse({'error': 'Malformed cursor or limit.'}, status=400)
+    response = StreamingHttpResponse(lines, content_type='application/x-ndjson')
+    patch_cache_control(response, no_store=True)
+    return response
+
+
 @login_required
 @user_passes_test(is_manager)
 def admin_dashboard(request):
-    complaints = Complaint.objects.order_by('status', '-created_at')
+    latest_comment = (
+        StatusUpdate.objects
+        .filter(complaint=OuterRef('pk'))
+        .order_by('-pk')
+        .values('comment')[:1]
+    )
+    complaints = (
+        Complaint.objects
+        .select_related('assigned_to')
+        .annotate(latest_comment=Subquery(latest_comment))
+    )
 
+    ordering = ADMIN_ORDERING
     flt = request.GET.get('filter', '').strip()
     if flt == 'closed_by_tech':
         complaints = complaints.filter(status__in=['FIX', 'CLO'], assigned_to__isnull=False)
 
     query = request.GET.get('q', '').strip()
     if query:
-        filters = Q()
         qlow = query.lower()
         matched = [code for code, label in Complaint.STATUS_CHOICES
                    if qlow in code.lower() or qlow in label.lower()]
-        if query.isdigit():
-            filters |= Q(id=int(query))
-        filters |= Q(location__icontains=query)
-        filters |= Q(description__icontains=query)
-        if matched:
-            filters |= Q(status__in=matched)
-        complaints = complaints.filter(filters)
-
-    technicians = User.objects.filter(groups__name='Technician')
+        if query.isdigit() or matched:
+            filters = text_filter(query)
+            if query.isdigit():
+                filters |= Q(id=int(query))
+            if matched:
+                filters |= Q(status__in=matched)
+            complaints = complaints.filter(filters)
+        else:
+            complaints = ranked_search(complaints, query)
+            ordering = SEARCH_ORDERING
+
+    technicians = list(User.objects.filter(groups__name='Technician').order_by('username'))
 
     if request.method == 'POST':
-        cid = request.POST.get('complaint')
-        tid = request.POST.get('technician')
-        comp = get_object_or_404(Complaint, pk=cid)
-        if comp.status in ['FIX', 'CLO']:
-            messages.error(request, f"Complaint #{comp.id} is already {comp.get_status_display()} and cannot reassign.")
-            return redirect('complaints:admin_dashboard')
-        if not (cid and tid):
-            messages.error(request, "Select both complaint and technician.")
-            return redirect('complaints:admin_dashboard')
-        tech = get_object_or_404(User, pk=tid)
-        StatusUpdate.objects.create(
-            complaint=comp,
-            status='INP',
-            comment=f'Assigned to {tech.username}'
+        # One row's Assign button or the bulk bar: either way a list of ids
+        ids = [pk for pk in request.POST.getlist('complaint') if pk.isdigit()]
+        tid = request.POST.get('technician', '')
+        status = request.POST.get('status', '')
+        if not ids or not (tid or status):
+            messages.error(request, "Select complaints and a technician or status.")
+            return redirect(request.get_full_path())
+        tech = next((t for t in technicians if str(t.pk) == tid), None)
+        if tid and tech is None:
+            messages.error(request, "Select a technician from the list.")
+            return redirect(request.get_full_path())
+        if status and status not in BULK_STATUSES:
+            messages.error(request, "Select a valid status.")
+            return redirect(request.get_full_path())
+        updated, skipped = transition_complaints(
+            ids, status=status or None, technician=tech, comment=request.POST.get('comment', '').strip()
         )
-        comp.assigned_to = tech
-        comp.status = 'INP'
-        comp.save()
-        if comp.email:
-            send_mail(
-                'Complaint Assignment',
-                f'Your complaint #{comp.id} has been assigned to {tech.username}.',
-                settings.DEFAULT_FROM_EMAIL,
-                [comp.email],
-                fail_silently=False,
-            )
-        messages.success(request, f'Complaint #{comp.id} assigned to {tech.username}.')
-        return redirect('complaints:admin_dashboard')
-
+        if skipped:
+            listed = ', '.join(f'#{pk}' for pk in skipped)
+            messages.error(request, f"Skipped {listed}: not found or already Fixed/Closed.")
+        if updated:
+            done = f'Complaint #{updated[0]}' if len(updated) == 1 else f'{len(updated)} complaints'
+            if tech is not None:
+                messages.success(request, f'{done} assigned to {tech.username}.')
+            else:
+                messages.success(request, f'{done} marked {dict(Complaint.STATUS_CHOICES)[status]}.')
+        return redirect(request.get_full_path())
+
+    page = paginate(request, complaints, ordering)
     return render(request, 'complaints/admin_dashboard.html', {
-        'complaints': complaints,
+        'complaints': page,
+        'page': page,
         'technicians': technicians,
+        'bulk_statuses': [(code, label) for code, label in Complaint.STATUS_CHOICES if code in BULK_STATUSES],
         'query': query,
     })
 
@@ -215,12 +241,10 @@ def complaint_update(request, pk):
             comp.status = upd.status
             comp.save()
             if comp.email:
-                send_mail(
+                queue_email(
+                    comp.email,
                     'Complaint Status Update',
                     f'Your complaint #{comp.id} status is now {comp.get_status_display()}.',
-                    settings.DEFAULT_FROM_EMAIL,
-                    [comp.email],
-                    fail_silently=False,
                 )
             messages.success(request, 'Status updated successfully.')
             if is_manager(request.user):
@@ -237,33 +261,18 @@ def complaint_update(request, pk):
 @login_required
 @user_passes_test(is_technician)
 def technician_dashboard(request):
-    qs = Complaint.objects.filter(assigned_to=request.user).order_by('-created_at')
-
-    total = qs.count()
-    status_counts = {
-        'new': qs.filter(status='NEW').count(),
-        'in_progress': qs.filter(status='INP').count(),
-        'fixed': qs.filter(status='FIX').count(),
-        'closed': qs.filter(status='CLO').count(),
-    }
-
-    resolved_deltas = qs.filter(status='CLO') \
-        .annotate(resolution=ExpressionWrapper(
-            F('updates__timestamp') - F('created_at'),
-            output_field=DurationField()
-        )) \
-        .values_list('resolution', flat=True)
-
-    days = [delta.total_seconds() / 86400 for delta in resolved_deltas if delta]
-    avg_resolution = round(sum(days) / len(days), 2) if days else 0
-    median_resolution = round(median(days), 2) if days else 0
-
+    complaints = Complaint.objects.filter(assigned_to=request.user)
+    status = request.GET.get('status', '')
+    status_label = dict(Complaint.STATUS_CHOICES).get(status)
+    if status_label:
+        # Filtered in the database (complaint_tech_status_idx), so only the asked-for rows are sent
+        complaints = complaints.filter(status=status)
+    page = paginate(request, complaints, RECENT_ORDERING)
     return render(request, 'complaints/technician_dashboard.html', {
-        'complaints': qs,
-        'total': total,
-        'status_counts': status_counts,
-        'avg_resolution': avg_resolution,
-        'median_resolution': median_resolution,
+        'complaints': page,
+        'page': page,
+        'status_label': status_label,
+        **cached_technician_metrics(request.user),
     })
 
 
@@ -274,144 +283,60 @@ def dashboard(request):
     Metrics. Closed includes FIX and CLO that were assigned to a technician.
     Monthly rows show month names.
     """
-    total = Complaint.objects.count()
+    return render(request, 'complaints/dashboard.html', cached_manager_metrics())
 
-    status_qs = Complaint.objects.values('status').annotate(cnt=Count('id'))
-    status_counts = {s['status']: s['cnt'] for s in status_qs}
 
-    closed_by_tech = Complaint.objects.filter(status__in=['FIX', 'CLO'], assigned_to__isnull=False).count()
-
-    breakdown = {
-        'new': status_counts.get('NEW', 0),
-        'in_progress': status_counts.get('INP', 0),
-        'fixed': status_counts.get('FIX', 0),
-        'closed': closed_by_tech,
-    }
-
-    resolved = Complaint.objects.filter(status__in=['FIX', 'CLO']).annotate(
-        resolution=ExpressionWrapper(
-            F('updates__timestamp') - F('created_at'),
-            output_field=DurationField()
-        )
-    ).values_list('resolution', flat=True)
-    days = [td.total_seconds() / 86400 for td in resolved if td]
-    avg_resolution = round(sum(days) / len(days), 2) if days else 0
-    median_resolution = round(median(days), 2) if days else 0
-
-    # Month names using TruncMonth
-    monthly = (
-        Complaint.objects
-        .annotate(month=TruncMonth('created_at'))
-        .values('month')
-        .annotate(count=Count('id'))
-        .order_by('month')
-    )
-
-    top_locations = (
-        Complaint.objects
-        .values('location')
-        .annotate(count=Count('id'))
-        .order_by('-count')[:5]
-    )
-
-    return render(request, 'complaints/dashboard.html', {
-        'total': total,
-        'breakdown': breakdown,
-        'avg_resolution': avg_resolution,
-        'median_resolution': median_resolution,
-        'monthly': list(monthly),
-        'top_locations': top_locations,
-    })
+@login_required
+@user_passes_test(is_manager)
+def metrics_cache_stats(request):
+    """Dashboard cache hit/miss counters for monitoring."""
+    return JsonResponse(metrics_cache.stats())
 
 
 @login_required
 @user_passes_test(is_manager)
 def reports(request):
     form = ReportForm(request.GET or None)
-    qs = Complaint.objects.order_by('-created_at')
-    if form.is_valid():
-        sd = form.cleaned_data['start_date']
-        ed = form.cleaned_data['end_date']
-        st = form.cleaned_data['status']
-        loc = form.cleaned_data['location']
-        if sd:
-            qs = qs.filter(created_at__date__gte=sd)
-        if ed:
-            qs = qs.filter(created_at__date__lte=ed)
-        if st:
-            qs = qs.filter(status=st)
-        if loc:
-            qs = qs.filter(location__icontains=loc)
+    qs = report_queryset(form.cleaned_data if form.is_valid() else None)
 
     export = request.GET.get('export')
     if export == 'csv':
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="complaints_report.csv"'
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'Name', 'Contact', 'Email', 'Location', 'Status', 'Created', 'Description'])
-        for c in qs:
-            writer.writerow([
-                c.id, c.name or '', c.contact or '', c.email or '',
-                c.location, c.get_status_display(), c.created_at.strftime('%Y-%m-%d'), c.description
-            ])
-        return response
+        return csv_response(qs, chunk_size=getattr(settings, 'REPORT_EXPORT_CHUNK_SIZE', 2000))
 
-    if export == 'pdf':
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=landscape(letter))
-        styles = getSampleStyleSheet()
-        elements = [Paragraph('Complaints Report', styles['Title'])]
-        data = [['ID', 'Name', 'Contact', 'Email', 'Location', 'Status', 'Created', 'Description']]
-        for c in qs:
-            data.append([
-                str(c.id), c.name or '', c.contact or '', c.email or '',
-                c.location, c.get_status_display(), c.created_at.strftime('%Y-%m-%d'), c.description
-            ])
-        table = Table(data, repeatRows=1)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ]))
-        elements.append(table)
-        doc.build(elements)
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="complaints_report.pdf"'
-        return response
-
-    if export == 'word':
-        docx = Document()
-        section = docx.sections[0]
-        section.orientation = WD_ORIENT.LANDSCAPE
-        section.page_width, section.page_height = section.page_height, section.page_width
-        docx.add_heading('Complaints Report', 0)
-        table = docx.add_table(rows=1, cols=8)
-        hdr = table.rows[0].cells
-        for i, h in enumerate(['ID', 'Name', 'Contact', 'Email', 'Location', 'Status', 'Created', 'Description']):
-            hdr[i].text = h
-        for c in qs:
-            row = table.add_row().cells
-            row[0].text = str(c.id)
-            row[1].text = c.name or ''
-            row[2].text = c.contact or ''
-            row[3].text = c.email or ''
-            row[4].text = c.location
-            row[5].text = c.get_status_display()
-            row[6].text = c.created_at.strftime('%Y-%m-%d')
-            row[7].text = c.description
-        buf = io.BytesIO()
-        docx.save(buf)
-        buf.seek(0)
-        response = HttpResponse(
-            buf.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-        )
-        response['Content-Disposition'] = 'attachment; filename="complaints_report.docx"'
-        return response
+    if export in ('pdf', 'word'):
+        job = submit_report_job(export, form.cleaned_data if form.is_valid() else None, request.user)
+        return redirect('complaints:report_job', pk=job.pk)
 
+    page = paginate(request, qs, RECENT_ORDERING)
     return render(request, 'complaints/reports.html', {
         'form': form,
-        'complaints': qs,
+        'complaints': page,
+        'page': page,
     })
+
+
+@login_required
+@user_passes_test(is_manager)
+def report_job(request, pk):
+    job = get_object_or_404(ReportJob, pk=pk)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'id': job.pk,
+            'state': job.state,
+            'progress': job.progress,
+            'processed_rows': job.processed_rows,
+            'total_rows': job.total_rows,
+            'error': job.error,
+            'download_url': reverse('complaints:report_job_download', args=[job.pk]) if job.state == ReportJob.DONE else None,
+        })
+    return render(request, 'complaints/report_job.html', {'job': job})
+
+
+@login_required
+@user_passes_test(is_manager)
+def report_job_download(request, pk):
+    job = get_object_or_404(ReportJob, pk=pk, state=ReportJob.DONE)
+    if not job.file:
+        raise Http404('Report file is missing.')
+    filename = f'complaints_report.{FILE_EXTENSIONS[job.format]}'
+    return FileResponse(job.file.open('rb'), as_attachment=True, filename=filename)
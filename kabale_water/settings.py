@@ -18,6 +18,17 @@ TWILIO_SID = os.getenv('TWILIO_SID', '')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN', '')
 TWILIO_PHONE = os.getenv('TWILIO_PHONE', '')
 
+# SMS gateway; swap for complaints.sms.LocmemSMSBackend in tests
+SMS_BACKEND = os.getenv('SMS_BACKEND', 'complaints.sms.TwilioSMSBackend')
+SMS_MAX_WORKERS = int(os.getenv('SMS_MAX_WORKERS', '8'))
+SMS_TIMEOUT = 10
+
+# Notification outbox, drained by `manage.py send_notifications`
+NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', '50'))
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', '5'))
+NOTIFICATION_RETRY_DELAY = int(os.getenv('NOTIFICATION_RETRY_DELAY', '60'))
+NOTIFICATION_MAX_DELAY = 60 * 60
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -30,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the whole stack; removes itself unless REQUEST_PROFILING is on
+    'complaints.profiling.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,6 +66,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'complaints.context_processors.roles',
             ],
         },
     },
@@ -88,6 +102,102 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# How close (difflib ratio, 0-1) a new free-text location must be to an
+# existing Location to be flagged as similar_to it; 0 turns matching off.
+# Spellings differing in a number or a short last word ("Ward 1"/"Ward 2",
+# "Nyabikoni A"/"B") never match. With LOCATION_AUTO_MERGE the match is used
+# directly instead of creating a new Location.
+LOCATION_MATCH_CUTOFF = 0.88
+LOCATION_AUTO_MERGE = os.getenv('LOCATION_AUTO_MERGE', 'False') == 'True'
+
+# Rows per page on the admin, technician and report listings (?per_page= up to the max)
+LISTING_PAGE_SIZE = 50
+LISTING_MAX_PAGE_SIZE = 200
+
+# Complaint photos are checked while they stream in and dropped as soon as
+# they exceed PHOTO_UPLOAD_MAX_SIZE or turn out not to be one of these formats
+PHOTO_UPLOAD_MAX_SIZE = int(os.getenv('PHOTO_UPLOAD_MAX_SIZE', str(10 * 1024 * 1024)))
+PHOTO_UPLOAD_TYPES = ('jpeg', 'png', 'webp')
+PHOTO_UPLOAD_FIELDS = ('photo',)
+FILE_UPLOAD_HANDLERS = [
+    'complaints.uploads.PhotoUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Photo renditions written by `manage.py process_photos`: longest edge in
+# pixels, output format (WEBP or JPEG) and encoder quality
+PHOTO_THUMBNAIL_SIZE = 320
+PHOTO_LARGE_SIZE = 1600
+PHOTO_FORMAT = os.getenv('PHOTO_FORMAT', 'WEBP')
+PHOTO_QUALITY = 80
+# Seconds a worker holds a photo it is rendering; if it dies, another worker
+# retries the photo once this has passed
+PHOTO_LEASE = 10 * 60
+
+# Rows fetched per database round-trip when streaming report exports
+REPORT_EXPORT_CHUNK_SIZE = 2000
+# PDF/Word exports are rendered by `manage.py process_report_jobs`. Jobs
+# queued longer than this are resubmitted, and jobs running longer are taken
+# over by another worker; superseded reports are kept this long for download
+REPORT_JOB_STALE_AFTER = 60 * 60
+# Finished report jobs and their files are deleted after this many seconds
+# by `manage.py prune_report_jobs`
+REPORT_JOB_RETENTION = 7 * 24 * 60 * 60
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'kabale-water'),
+    }
+}
+# True when every worker process sees the same cache, so dropping an entry in
+# one process drops it for all of them
+SHARED_CACHE = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+# Seconds a user's group names are cached between requests (0: once per request);
+# dropped whenever their group membership changes. Off unless the cache is
+# shared: with a per-process cache the other workers would keep a revoked role
+ROLE_CACHE_TTL = int(os.getenv('ROLE_CACHE_TTL', '300' if SHARED_CACHE else '0'))
+# Dashboard contexts are cached this many seconds (0 disables) and dropped on
+# any complaint or status update write; hit/miss counts at /metrics/cache/.
+# Off unless the cache is shared, for the same reason as ROLE_CACHE_TTL
+METRICS_CACHE_TTL = int(os.getenv('METRICS_CACHE_TTL', '300' if SHARED_CACHE else '0'))
+# Seconds a complaint's public status (/lookup/<id>/status.json) is cached
+# (0 disables); dropped whenever the complaint or its status updates change.
+# Off unless the cache is shared; ETags and 304s work either way
+STATUS_CACHE_TTL = int(os.getenv('STATUS_CACHE_TTL', '60' if SHARED_CACHE else '0'))
+
+# Bearer tokens accepted by the /api/changes/ NDJSON feed (comma-separated);
+# rows per type per call (?limit= up to the max), and how many seconds old a
+# change must be before it is sent so late commits cannot land behind a cursor
+CHANGES_FEED_TOKENS = [t for t in os.getenv('CHANGES_FEED_TOKENS', '').split(',') if t]
+CHANGES_FEED_LIMIT = 5000
+CHANGES_FEED_MAX_LIMIT = 50000
+CHANGES_FEED_SETTLE = 5
+
+# Opt-in request profiling: query count, SQL and template time
+# as a Server-Timing header and JSON lines on the complaints.profiling logger.
+# Requests slower than REQUEST_PROFILING_SLOW_MS also log their top queries
+# and the stack of the slowest one.
+REQUEST_PROFILING = os.getenv('REQUEST_PROFILING', 'False') == 'True'
+REQUEST_PROFILING_HEADER = os.getenv('REQUEST_PROFILING_HEADER', 'True') == 'True'
+REQUEST_PROFILING_SLOW_MS = int(os.getenv('REQUEST_PROFILING_SLOW_MS', '500'))
+REQUEST_PROFILING_TOP_QUERIES = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'complaints.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_REDIRECT_URL = '/redirect-after-login/'